@@ -20,6 +20,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from config.settings import get_settings
+from db.load_curated import load_curated_prices_range_to_db
 from flows.curate_data import curate_data
 from flows.ingest_prices import ingest_prices
 from flows.build_features import build_features
@@ -267,15 +268,22 @@ def backfill_data(
         logger.info("Step 3: Running curation for all dates")
         logger.info("=" * 60)
         
+        # Curate each date without its own DuckDB load, then load the whole range
+        # in a single statement below
+        curated_dates = []
         for i, curate_date in enumerate(available_dates, 1):
             logger.info(f"Curating date {curate_date} ({i}/{len(available_dates)})")
             try:
-                curate_data(run_date=curate_date.strftime("%Y-%m-%d"))
+                curate_data(run_date=curate_date.strftime("%Y-%m-%d"), load_prices=False)
             except Exception as exc:
                 logger.error(f"Failed to curate {curate_date}: {exc}")
                 continue
+            curated_dates.append(curate_date)
         
-        logger.info(f"Completed curation for {len(available_dates)} dates")
+        logger.info(f"Completed curation for {len(curated_dates)} dates")
+        
+        if curated_dates:
+            load_curated_prices_range_to_db(curated_dates[0], curated_dates[-1])
     
     # Step 4: Optionally run feature building
     if run_features:
@@ -8,7 +8,7 @@ import pandas as pd
 
 from config.settings import get_settings
 from logging_utils.setup import logger
-from utils.paths import ensure_dir
+from utils.paths import DICTIONARY_COLUMNS, ensure_dir, write_parquet
 
 
 class FundamentalsCurationError(Exception):
@@ -51,7 +51,12 @@ def curate_quarterly_fundamentals(
         return pd.DataFrame()
     
     # Read all ticker manifest files for this quarter
-    manifest_files = [f for f in raw_quarter_dir.glob("*.parquet") if f.name != "manifest.parquet"]
+    # Skip run-level files such as _skipped.parquet
+    manifest_files = [
+        f
+        for f in raw_quarter_dir.glob("*.parquet")
+        if f.name != "manifest.parquet" and not f.name.startswith("_")
+    ]
     if not manifest_files:
         logger.warning(f"No manifest files found in {raw_quarter_dir}")
         return pd.DataFrame()
@@ -107,7 +112,7 @@ def curate_quarterly_fundamentals(
     ensure_dir(curated_quarter_dir)
     output_path = curated_quarter_dir / f"{year}_{quarter}.parquet"
     
-    combined.to_parquet(output_path, index=False)
+    write_parquet(combined, output_path, use_dictionary=DICTIONARY_COLUMNS)
     logger.info(
         f"Saved curated fundamentals to {output_path} "
         f"({len(combined)} rows, {combined['ticker'].nunique()} tickers)"
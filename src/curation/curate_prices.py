@@ -9,7 +9,7 @@ import pandas as pd
 from config.settings import get_settings
 from logging_utils.setup import logger
 from utils.dates import date_partition
-from utils.paths import ensure_dir
+from utils.paths import DICTIONARY_COLUMNS, ensure_dir, write_parquet
 
 
 class PriceCurationError(Exception):
@@ -118,15 +118,15 @@ def curate_daily_prices(run_date: date, raw_dir: Path | None = None, curated_dir
     # Save all dates found in the raw data (for historical data accumulation)
     # This allows feature calculation to have access to historical data
     dates_saved = 0
-    for date_val in combined["date"].unique():
+    # One grouping pass instead of a full boolean mask over the frame per date
+    for date_val, date_data in combined.groupby("date", sort=False):
         date_dt = pd.Timestamp(date_val).date()
         date_partition_str = date_partition(date_dt)
         date_output_dir = curated_root / "daily_prices" / date_partition_str
         ensure_dir(date_output_dir)
-        date_output_path = date_output_dir / f"{date_dt:%Y-%m-%d}.parquet"
+        date_output_path = date_output_dir / f"{date_dt.isoformat()}.parquet"
         
-        date_data = combined[combined["date"] == date_val].copy()
-        date_data.to_parquet(date_output_path, index=False)
+        write_parquet(date_data, date_output_path, use_dictionary=DICTIONARY_COLUMNS)
         dates_saved += 1
     
     # Return only the run_date data (or latest if run_date not found)
@@ -1,15 +1,38 @@
 from __future__ import annotations
 
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date, datetime
+from functools import lru_cache, partial
 from pathlib import Path
+from types import SimpleNamespace
+from typing import Iterator
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import requests
 from sec_edgar_downloader import Downloader
 from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
 from config.settings import get_settings
 from logging_utils.setup import logger
-from utils.paths import ensure_dir
+from utils.paths import DICTIONARY_COLUMNS, ensure_dir, write_parquet, write_parquet_table
+
+
+# sec-edgar-downloader throttles every request through a process-wide 10 req/s
+# limiter, so a handful of workers is enough to keep that budget saturated
+DEFAULT_MAX_WORKERS = 8
+
+# Run-level record of tickers that produced no manifest; the leading underscore
+# keeps it out of the per-ticker manifests that curation reads
+SKIPPED_MANIFEST_NAME = "_skipped.parquet"
+
+MANIFEST_COLUMNS = ["ticker", "filing_type", "download_time", "file_path", "source"]
+
+# (connect, read) timeouts for every EDGAR request; filings can be several MB, so the
+# read timeout (max wait between bytes) is looser than Stooq's
+SEC_REQUEST_TIMEOUT = (3.05, 30.0)
 
 
 class SecDownloadError(Exception):
@@ -21,6 +44,75 @@ def _quarter_from_date(dt: date) -> str:
     return f"Q{quarter}"
 
 
+def _partition_dir(raw_dir: Path | None, run_date: date) -> Path:
+    """Return the raw YYYY/Qn directory that holds manifests for run_date."""
+    target_root = Path(raw_dir) if raw_dir else get_settings().raw_fundamentals_dir
+    return target_root / f"{run_date:%Y}" / _quarter_from_date(run_date)
+
+
+def _empty_manifest() -> pd.DataFrame:
+    return pd.DataFrame(columns=MANIFEST_COLUMNS)
+
+
+def _install_sec_request_timeout() -> None:
+    """
+    Bound every sec-edgar-downloader request by SEC_REQUEST_TIMEOUT.
+    
+    The library issues bare requests.get calls with no timeout and exposes no
+    session to configure, so a stalled EDGAR response would block its worker
+    forever. Its gateway module gets a requests stand-in whose get carries the
+    timeout; a timeout then raises and the tenacity retry on _download_filings
+    reissues the call.
+    """
+    try:
+        from sec_edgar_downloader import _sec_gateway
+    except ImportError:  # pragma: no cover - library layout changed
+        logger.warning("sec-edgar-downloader gateway not found; SEC requests have no timeout")
+        return
+    if getattr(_sec_gateway, "requests", None) is requests:
+        _sec_gateway.requests = SimpleNamespace(
+            get=partial(requests.get, timeout=SEC_REQUEST_TIMEOUT)
+        )
+
+
+@lru_cache(maxsize=8)
+def _get_downloader(company_name: str, email_address: str, download_folder: str) -> Downloader:
+    """Return a shared Downloader so the CIK mapping and HTTP session are reused across tickers."""
+    _install_sec_request_timeout()
+    # Downloader requires positional args: company_name, email_address, download_folder (optional)
+    return Downloader(company_name, email_address, download_folder=download_folder)
+
+
+def _walk_files(root: str | Path) -> Iterator[str]:
+    """Yield file paths under root, using cached dirent types instead of per-entry stat."""
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk_files(entry.path)
+            elif entry.is_file():
+                yield entry.path
+
+
+def _constant_column(
+    value: object, length: int, value_type: pa.DataType | None = None
+) -> pa.DictionaryArray:
+    """Build a length-N column of one repeated value as a single-entry dictionary array."""
+    indices = pa.array(np.zeros(length, dtype=np.int32))
+    return pa.DictionaryArray.from_arrays(indices, pa.array([value], type=value_type))
+
+
+def _decode_dictionaries(table: pa.Table) -> pa.Table:
+    """Cast dictionary-encoded columns back to their plain value types."""
+    return pa.table(
+        {
+            name: column.cast(column.type.value_type)
+            if pa.types.is_dictionary(column.type)
+            else column
+            for name, column in zip(table.column_names, table.columns)
+        }
+    )
+
+
 @retry(
     reraise=True,
     retry=retry_if_exception_type(Exception),
@@ -43,18 +135,13 @@ def download_fundamentals(
 ) -> pd.DataFrame:
     """Download recent fundamentals filings and write a manifest parquet in raw layer."""
     settings = get_settings()
-    target_root = Path(raw_dir) if raw_dir else settings.raw_fundamentals_dir
-
-    year = f"{run_date:%Y}"
-    quarter = _quarter_from_date(run_date)
-    partition_dir = target_root / year / quarter
+    partition_dir = _partition_dir(raw_dir, run_date)
     ensure_dir(partition_dir)
 
-    # Downloader requires positional args: company_name, email_address, download_folder (optional)
-    downloader = Downloader(
+    downloader = _get_downloader(
         settings.sec_edgar_company_name,
         settings.sec_edgar_user_email,
-        download_folder=str(partition_dir),
+        str(partition_dir),
     )
 
     try:
@@ -67,51 +154,120 @@ def download_fundamentals(
         # Handle invalid ticker (e.g., BRK.B) gracefully
         if "invalid" in str(exc).lower() or "cannot be mapped" in str(exc).lower():
             logger.warning(f"Skipping {ticker}: {exc}")
-            # Return empty manifest
-            manifest = pd.DataFrame(
-                columns=["ticker", "filing_type", "download_time", "file_path", "source"]
-            )
-            output_path = partition_dir / f"{ticker}.parquet"
-            manifest.to_parquet(output_path, index=False)
-            return manifest
+            # Nothing to curate, so don't leave a schema-only manifest behind
+            return _empty_manifest()
         raise SecDownloadError from exc
     except Exception as exc:  # pragma: no cover - external dependency path
         logger.error(f"SEC download failed for {ticker}: {exc}")
         raise SecDownloadError from exc
 
     # Find the actual downloaded files
-    # Files are saved as: {partition_dir}/{ticker}/{filing_type}/...
-    ticker_dir = partition_dir / ticker / filing_type
+    # Files are saved as: {partition_dir}/sec-edgar-filings/{ticker}/{filing_type}/...
+    ticker_dir = partition_dir / "sec-edgar-filings" / ticker / filing_type
     if ticker_dir.exists():
         # Get all files recursively (excluding directories)
-        file_paths = [str(p) for p in ticker_dir.rglob("*") if p.is_file()]
+        file_paths = list(_walk_files(ticker_dir))
     else:
         file_paths = []
         if num_downloaded > 0:
             logger.warning(f"Expected {num_downloaded} files for {ticker} but none found in {ticker_dir}")
 
+    if not file_paths:
+        logger.warning(f"No {filing_type} filings found for {ticker}, skipping manifest")
+        return _empty_manifest()
+
     # Build simple manifest so raw layer is queryable
-    if file_paths:
-        manifest = pd.DataFrame(
+    output_path = partition_dir / f"{ticker}.parquet"
+    # Build the Arrow table directly; constant columns are stored once as dictionaries
+    n_files = len(file_paths)
+    table = pa.table(
+        {
+            "ticker": _constant_column(ticker, n_files),
+            "filing_type": _constant_column(filing_type, n_files),
+            "download_time": _constant_column(datetime.utcnow(), n_files, pa.timestamp("us")),
+            "file_path": pa.array([str(Path(p).resolve()) for p in file_paths]),
+            "source": _constant_column("sec_edgar", n_files),
+        }
+    )
+    write_parquet_table(table, output_path, use_dictionary=DICTIONARY_COLUMNS)
+    # Dictionaries are a storage detail: hand callers the plain object/datetime64[ns]
+    # columns the manifest has always had rather than categoricals
+    manifest = _decode_dictionaries(table).to_pandas(coerce_temporal_nanoseconds=True)
+
+    logger.info(f"Saved SEC manifest for {ticker} to {output_path} ({n_files} files)")
+    return manifest
+
+
+def download_fundamentals_many(
+    tickers: list[str],
+    run_date: date,
+    filing_type: str = "10-Q",
+    amount: int = 1,
+    raw_dir: Path | None = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> dict[str, pd.DataFrame]:
+    """
+    Download fundamentals for many tickers concurrently.
+
+    Tickers share one Downloader and run on a bounded thread pool; the SEC's
+    10 requests/second ceiling is enforced by sec-edgar-downloader's global
+    rate limiter, so throughput is bounded by that budget rather than by
+    serial round trips.
+
+    Args:
+        tickers: Tickers to download
+        run_date: Date used to pick the year/quarter partition
+        filing_type: SEC form to download
+        amount: Number of filings per ticker
+        raw_dir: Optional override for raw fundamentals directory
+        max_workers: Maximum number of tickers downloading at once
+
+    Returns:
+        Mapping of ticker to its manifest. Tickers whose download failed are
+        logged and left out of the mapping. Failed tickers and tickers without
+        filings are recorded once in ``_skipped.parquet`` in the quarter directory.
+    """
+    results: dict[str, pd.DataFrame] = {}
+    if not tickers:
+        return results
+
+    skipped: dict[str, str] = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tickers)))) as pool:
+        futures = {
+            pool.submit(
+                download_fundamentals, ticker, run_date, filing_type, amount, raw_dir
+            ): ticker
+            for ticker in tickers
+        }
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                manifest = future.result()
+            except SecDownloadError:
+                logger.warning(f"Skipping {ticker}: SEC download failed")
+                skipped[ticker] = "download_failed"
+                continue
+            results[ticker] = manifest
+            if manifest.empty:
+                skipped[ticker] = "no_filings"
+
+    if skipped:
+        skipped_path = _partition_dir(raw_dir, run_date) / SKIPPED_MANIFEST_NAME
+        ensure_dir(skipped_path.parent)
+        skipped_df = pd.DataFrame(
             {
-                "ticker": [ticker] * len(file_paths),
-                "filing_type": [filing_type] * len(file_paths),
-                "download_time": [datetime.utcnow()] * len(file_paths),
-                "file_path": [str(Path(p).resolve()) for p in file_paths],
-                "source": ["sec_edgar"] * len(file_paths),
+                "ticker": list(skipped),
+                "reason": list(skipped.values()),
+                "run_date": pd.Timestamp(run_date),
             }
         )
-    else:
-        # Create empty manifest if no files found
-        manifest = pd.DataFrame(
-            columns=["ticker", "filing_type", "download_time", "file_path", "source"]
-        )
+        write_parquet(skipped_df, skipped_path)
+        logger.info(f"Recorded {len(skipped)} skipped tickers in {skipped_path}")
 
-    output_path = partition_dir / f"{ticker}.parquet"
-    manifest.to_parquet(output_path, index=False)
-    logger.info(f"Saved SEC manifest for {ticker} to {output_path} ({len(file_paths)} files)")
-    return manifest
+    logger.info(f"Downloaded SEC fundamentals for {len(results)}/{len(tickers)} tickers")
+    return results
 
 
-__all__ = ["download_fundamentals", "SecDownloadError"]
+__all__ = ["download_fundamentals", "download_fundamentals_many", "SecDownloadError"]
 
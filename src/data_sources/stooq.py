@@ -1,40 +1,115 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date, timedelta
+from io import StringIO
 from pathlib import Path
 
 import pandas as pd
-from pandas_datareader import data as web
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import requests
 from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
 from config.settings import get_settings
 from logging_utils.setup import logger
 from utils.dates import date_partition
-from utils.paths import ensure_dir
+from utils.paths import (
+    DICTIONARY_COLUMNS,
+    PARQUET_COMPRESSION,
+    PARQUET_COMPRESSION_LEVEL,
+    ensure_dir,
+)
+
+
+STOOQ_CSV_URL = "https://stooq.com/q/d/l/"
+
+# Stooq throttles at ~10 requests/second, so keep concurrency just below that.
+DEFAULT_MAX_WORKERS = 8
+
+# (connect, read) timeouts: a typical Stooq CSV answers well under a second, so a
+# stalled request fails fast inside its own worker and tenacity reissues it
+STOOQ_REQUEST_TIMEOUT = (3.05, 5.0)
+
+# Raw files hold one ticker-day each, so keep row groups and data pages small,
+# dictionary-encode only the repeated string columns and keep statistics just for
+# the date column that readers filter on
+_RAW_WRITE_OPTIONS = dict(
+    compression=PARQUET_COMPRESSION,
+    compression_level=PARQUET_COMPRESSION_LEVEL,
+    use_dictionary=DICTIONARY_COLUMNS,
+    write_statistics=["date"],
+    data_page_size=64 * 1024,
+    row_group_size=4096,
+)
 
 
 class StooqFetchError(Exception):
     """Raised when Stooq fetch fails after retries."""
 
 
+# Market suffixes Stooq understands; any other dotted part is a share class (BRK.B)
+_STOOQ_MARKETS = ("de", "hk", "hu", "jp", "uk", "us")
+
+
+def _stooq_symbol(ticker: str) -> str:
+    """
+    Map a universe ticker to a Stooq symbol the way pandas_datareader's Stooq reader did.
+    
+    Bare tickers get a .US suffix, .PL listings drop the suffix, known market
+    suffixes are kept, and any other dotted ticker (e.g. BRK.B -> BRK.B.US) is
+    treated as a US class share. Indices (^SPX) pass through unchanged.
+    """
+    if ticker.startswith("^"):
+        return ticker
+    parts = ticker.split(".")
+    if len(parts) == 1:
+        return f"{ticker}.US"
+    if parts[1].lower() == "pl":
+        return parts[0]
+    if parts[1].lower() not in _STOOQ_MARKETS:
+        return f"{ticker}.US"
+    return ticker
+
+
 @retry(
     reraise=True,
     retry=retry_if_exception_type(Exception),
     stop=stop_after_attempt(3),
     wait=wait_exponential(multiplier=1, min=1, max=8),
 )
-def _fetch_stooq_window(ticker: str, start: date, end: date) -> pd.DataFrame:
-    return web.DataReader(ticker, "stooq", start=start, end=end)
-
-
-def fetch_stooq_prices(ticker: str, run_date: date, raw_dir: Path | None = None) -> pd.DataFrame:
-    """Fetch daily price data for a ticker from Stooq and persist to raw Parquet."""
-    settings = get_settings()
-    target_dir = Path(raw_dir) if raw_dir else settings.raw_prices_dir
+def _fetch_stooq_window(
+    session: requests.Session, ticker: str, start: date, end: date
+) -> pd.DataFrame:
+    """Download the daily CSV for a ticker straight from Stooq's export endpoint."""
+    response = session.get(
+        STOOQ_CSV_URL,
+        params={
+            "s": _stooq_symbol(ticker),
+            "d1": f"{start:%Y%m%d}",
+            "d2": f"{end:%Y%m%d}",
+            "i": "d",
+        },
+        timeout=STOOQ_REQUEST_TIMEOUT,
+    )
+    response.raise_for_status()
+    # Stooq answers unknown symbols with a plain "No data" body and throttled clients
+    # with a notice page; neither is a CSV, so fail (and retry) instead of treating
+    # the ticker as having no prices
+    if not response.text.startswith("Date,"):
+        raise ValueError(f"Stooq returned no CSV data for {ticker}: {response.text[:80]!r}")
+    return pd.read_csv(StringIO(response.text))
+
+
+def _fetch_and_store(
+    session: requests.Session, ticker: str, run_date: date, target_dir: Path
+) -> pd.DataFrame:
+    """Fetch a single ticker's window and persist it to the raw layer."""
     window_start = run_date - timedelta(days=120)
 
     try:
-        df = _fetch_stooq_window(ticker, window_start, run_date)
+        df = _fetch_stooq_window(session, ticker, window_start, run_date)
     except Exception as exc:  # pragma: no cover - network/remote failure path
         logger.error(f"Stooq fetch failed for {ticker}: {exc}")
         raise StooqFetchError from exc
@@ -43,7 +118,6 @@ def fetch_stooq_prices(ticker: str, run_date: date, raw_dir: Path | None = None)
         logger.warning(f"Empty DataFrame returned from Stooq for {ticker}")
         return pd.DataFrame()
 
-    df = df.reset_index()
     # Handle different possible date column names
     date_col = None
     for col in df.columns:
@@ -57,6 +131,7 @@ def fetch_stooq_prices(ticker: str, run_date: date, raw_dir: Path | None = None)
     
     df = df.rename(columns={date_col: "date"})
     df.columns = [c.lower() for c in df.columns]
+    df["date"] = pd.to_datetime(df["date"])
     df = df.sort_values("date")
     df["ticker"] = ticker
     df["source"] = "stooq"
@@ -67,20 +142,21 @@ def fetch_stooq_prices(ticker: str, run_date: date, raw_dir: Path | None = None)
         return df_window
 
     # Save all historical data to enable feature calculation
-    # Save each date to its own partition so curation can process them
-    dates_saved = 0
-    for date_val in df_window["date"].unique():
-        date_dt = pd.Timestamp(date_val).date()
-        partition = date_partition(date_dt)
-        output_dir = target_dir / partition
+    # Each date lands in its own YYYY/MM/DD/{ticker}.parquet so curation can process
+    # them and re-runs overwrite the same file. The window is converted to Arrow once
+    # and sliced per date (rows are date-sorted, so each date is one contiguous run)
+    window_table = pa.Table.from_pandas(df_window, preserve_index=False)
+    dates, starts = np.unique(df_window["date"].to_numpy(), return_index=True)
+    bounds = [*starts.tolist(), len(df_window)]
+    for date_val, start, stop in zip(dates, bounds, bounds[1:]):
+        output_dir = target_dir / date_partition(pd.Timestamp(date_val).date())
         ensure_dir(output_dir)
-        output_path = output_dir / f"{ticker}.parquet"
-        
-        # Get data for this specific date
-        df_date = df_window[df_window["date"] == pd.Timestamp(date_val)]
-        if not df_date.empty:
-            df_date.to_parquet(output_path, index=False)
-            dates_saved += 1
+        pq.write_table(
+            window_table.slice(start, stop - start),
+            output_dir / f"{ticker}.parquet",
+            **_RAW_WRITE_OPTIONS,
+        )
+    dates_saved = len(dates)
     
     # Return the data for run_date (or latest available)
     df_selected = df_window[df_window["date"] == pd.Timestamp(run_date)]
@@ -94,5 +170,57 @@ def fetch_stooq_prices(ticker: str, run_date: date, raw_dir: Path | None = None)
     return df_selected
 
 
-__all__ = ["fetch_stooq_prices", "StooqFetchError"]
+def fetch_stooq_prices_batch(
+    tickers: list[str],
+    run_date: date,
+    raw_dir: Path | None = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> dict[str, pd.DataFrame]:
+    """
+    Fetch daily price data for many tickers concurrently and persist to raw Parquet.
+
+    Requests share one HTTP session and run on a bounded thread pool, so the
+    batch costs roughly one round trip per ``max_workers`` tickers instead of
+    one per ticker.
+
+    Args:
+        tickers: Tickers to fetch
+        run_date: Date to fetch prices up to
+        raw_dir: Optional override for raw prices directory
+        max_workers: Maximum number of concurrent requests to Stooq
+
+    Returns:
+        Mapping of ticker to the rows selected for run_date. Tickers whose
+        fetch failed are logged and left out of the mapping.
+    """
+    settings = get_settings()
+    target_dir = Path(raw_dir) if raw_dir else settings.raw_prices_dir
+
+    results: dict[str, pd.DataFrame] = {}
+    with requests.Session() as session:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tickers)))) as pool:
+            futures = {
+                pool.submit(_fetch_and_store, session, ticker, run_date, target_dir): ticker
+                for ticker in tickers
+            }
+            for future in as_completed(futures):
+                ticker = futures[future]
+                try:
+                    results[ticker] = future.result()
+                except StooqFetchError:
+                    logger.warning(f"Skipping {ticker}: Stooq fetch failed")
+
+    logger.info(f"Fetched Stooq prices for {len(results)}/{len(tickers)} tickers")
+    return results
+
+
+def fetch_stooq_prices(ticker: str, run_date: date, raw_dir: Path | None = None) -> pd.DataFrame:
+    """Fetch daily price data for a ticker from Stooq and persist to raw Parquet."""
+    results = fetch_stooq_prices_batch([ticker], run_date, raw_dir=raw_dir, max_workers=1)
+    if ticker not in results:
+        raise StooqFetchError(f"Stooq fetch failed for {ticker}")
+    return results[ticker]
+
+
+__all__ = ["fetch_stooq_prices", "fetch_stooq_prices_batch", "StooqFetchError"]
 
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from datetime import date
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from config.settings import get_settings
+from logging_utils.setup import logger
+from utils.paths import DICTIONARY_COLUMNS, ensure_dir, write_parquet_table
+
+COMPACTED_ROW_GROUP_SIZE = 131072
+
+
+def compacted_month_path(year: int, month: int, curated_dir: Path | None = None) -> Path:
+    """Return the path of the consolidated Parquet file for a month of curated prices."""
+    settings = get_settings()
+    curated_root = Path(curated_dir) if curated_dir else settings.curated_dir
+    return curated_root / "daily_prices_monthly" / f"{year:04d}" / f"{year:04d}-{month:02d}.parquet"
+
+
+def _daily_month_files(year: int, month: int, curated_root: Path) -> list[Path]:
+    """Return the month's curated daily price files in date order."""
+    month_dir = curated_root / "daily_prices" / f"{year:04d}" / f"{month:02d}"
+    return sorted(month_dir.glob("*/*.parquet")) if month_dir.exists() else []
+
+
+def _is_current(output_path: Path, daily_files: list[Path]) -> bool:
+    """True if the compacted file exists and is newer than every daily file."""
+    if not output_path.exists():
+        return False
+    newest_daily = max(f.stat().st_mtime for f in daily_files)
+    return output_path.stat().st_mtime >= newest_daily
+
+
+def current_compacted_month(
+    year: int, month: int, curated_dir: Path | None = None
+) -> Path | None:
+    """
+    Return the month's compacted file if it is up to date with the daily files.
+    
+    Readers use this to scan one file for a completed month; None means the daily
+    files must be read instead (no compacted file, or a day was re-curated since).
+    """
+    settings = get_settings()
+    curated_root = Path(curated_dir) if curated_dir else settings.curated_dir
+    daily_files = _daily_month_files(year, month, curated_root)
+    output_path = compacted_month_path(year, month, curated_root)
+    if daily_files and _is_current(output_path, daily_files):
+        return output_path
+    return None
+
+
+def compact_month(
+    year: int,
+    month: int,
+    curated_dir: Path | None = None,
+    force: bool = False,
+) -> Path | None:
+    """
+    Consolidate a month of curated daily price files into a single Parquet file.
+    
+    Reads every daily_prices/YYYY/MM/DD/*.parquet file for the month, sorts the rows
+    by (ticker, date) and writes them to daily_prices_monthly/YYYY/YYYY-MM.parquet so
+    that range loads (load_curated_prices_range_to_db) open one file per completed
+    month instead of one per day. The daily files are left in place because
+    per-date loads still read them.
+    
+    Args:
+        year: Year of the month to compact
+        month: Month to compact (1-12)
+        curated_dir: Optional override for curated directory
+        force: Rewrite the monthly file even if it is newer than every daily file
+        
+    Returns:
+        Path to the consolidated file, or None if the month has no curated data
+    """
+    settings = get_settings()
+    curated_root = Path(curated_dir) if curated_dir else settings.curated_dir
+    daily_files = _daily_month_files(year, month, curated_root)
+    if not daily_files:
+        logger.warning(f"No curated price files to compact for {year:04d}-{month:02d}")
+        return None
+    
+    output_path = compacted_month_path(year, month, curated_root)
+    if not force and _is_current(output_path, daily_files):
+        logger.debug(f"Compacted file {output_path} is up to date")
+        return output_path
+    
+    # Promote schemas so days with all-null columns still combine
+    table = pa.concat_tables(
+        [pq.read_table(f) for f in daily_files], promote_options="default"
+    )
+    table = table.sort_by([("ticker", "ascending"), ("date", "ascending")])
+    
+    ensure_dir(output_path.parent)
+    write_parquet_table(
+        table,
+        output_path,
+        row_group_size=COMPACTED_ROW_GROUP_SIZE,
+        use_dictionary=DICTIONARY_COLUMNS,
+    )
+    logger.info(
+        f"Compacted {len(daily_files)} daily files into {output_path} ({table.num_rows} rows)"
+    )
+    return output_path
+
+
+def compact_previous_month(run_date: date, curated_dir: Path | None = None) -> Path | None:
+    """Compact the last fully completed month before run_date."""
+    if run_date.month == 1:
+        year, month = run_date.year - 1, 12
+    else:
+        year, month = run_date.year, run_date.month - 1
+    return compact_month(year, month, curated_dir=curated_dir)
+
+
+__all__ = [
+    "compact_month",
+    "compact_previous_month",
+    "compacted_month_path",
+    "current_compacted_month",
+]
@@ -1,52 +1,116 @@
 from __future__ import annotations
 
+import re
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
 import duckdb
+import pandas as pd
 from loguru import logger
 
 from config.settings import get_settings
 
 
+# Statements that can change the catalog and so invalidate cached existence checks
+_DDL_PATTERN = re.compile(r"^\s*(CREATE|DROP|ALTER)\b", re.IGNORECASE)
+
+
+def _sql_literal(value: str) -> str:
+    """Quote value as a SQL string literal, for statements that cannot bind parameters."""
+    if "\x00" in value:
+        raise ValueError("SQL string literals cannot contain NUL characters")
+    return "'" + value.replace("'", "''") + "'"
+
+
 class DuckDBClient:
     """Client for managing DuckDB database connections and operations."""
 
-    def __init__(self, db_path: Path | str | None = None):
+    def __init__(self, db_path: Path | str | None = None, read_only: bool = False):
         """
         Initialize DuckDB client.
         
         Args:
             db_path: Optional path to DuckDB database file. If None, uses in-memory database.
+            read_only: Open the database file read-only (ignored for in-memory databases)
         """
         self.db_path = Path(db_path) if db_path else None
-        self.conn = duckdb.connect(str(self.db_path) if self.db_path else ":memory:")
+        if self.db_path:
+            self.conn = duckdb.connect(str(self.db_path), read_only=read_only)
+        else:
+            self.conn = duckdb.connect(":memory:")
+        # Catalog lookups keyed by (schema,), (schema, table), (schema, table, column)
+        # or ("PRIMARY KEY", schema, table)
+        self._exists_cache: dict[tuple, bool] = {}
         logger.info(f"Connected to DuckDB: {self.db_path or 'in-memory'}")
     
-    def execute(self, query: str) -> duckdb.DuckDBPyConnection:
-        """Execute a SQL query."""
-        return self.conn.execute(query)
+    def execute(self, query: str, params: list | None = None) -> duckdb.DuckDBPyConnection:
+        """Execute a SQL query, binding any ``?`` placeholders from params."""
+        if _DDL_PATTERN.match(query):
+            self._exists_cache.clear()
+        return self.conn.execute(query, params)
     
     def create_schema(self, schema_name: str = "curated") -> None:
         """Create a schema if it doesn't exist."""
+        if self._exists_cache.get((schema_name,)):
+            return
         self.execute(f"CREATE SCHEMA IF NOT EXISTS {schema_name}")
+        self._exists_cache[(schema_name,)] = True
         logger.info(f"Schema '{schema_name}' ready")
     
+    def has_table(self, schema_name: str, table_name: str) -> bool:
+        """Check if a table or view exists, caching the answer until the next DDL."""
+        key = (schema_name, table_name)
+        if key not in self._exists_cache:
+            result = self.execute(
+                "SELECT COUNT(*) FROM information_schema.tables "
+                "WHERE table_schema = ? AND table_name = ?",
+                [schema_name, table_name],
+            ).fetchone()
+            self._exists_cache[key] = result[0] > 0
+        return self._exists_cache[key]
+    
+    def has_primary_key(self, table_name: str, schema_name: str = "curated") -> bool:
+        """Check if a table has a primary key, caching the answer until the next DDL."""
+        key = ("PRIMARY KEY", schema_name, table_name)
+        if key not in self._exists_cache:
+            result = self.execute(
+                "SELECT COUNT(*) FROM duckdb_constraints() "
+                "WHERE schema_name = ? AND table_name = ? "
+                "AND constraint_type = 'PRIMARY KEY'",
+                [schema_name, table_name],
+            ).fetchone()
+            self._exists_cache[key] = result[0] > 0
+        return self._exists_cache[key]
+    
     def load_parquet_to_table(
         self,
         parquet_path: Path | str,
         table_name: str,
         schema_name: str = "curated",
         if_exists: str = "replace",
+        materialize: bool = True,
+        indexes: list[str] | None = None,
     ) -> None:
         """
         Load a Parquet file into a DuckDB table.
         
+        With materialize=False the file is exposed as a view over read_parquet
+        instead, so nothing is copied and filters/projections are pushed down into
+        the Parquet scan. The view references the file by absolute path, so only use
+        it when the Parquet file stays next to the database. Materializing stays the
+        default for that reason: the marts database is synced and opened away from
+        its Parquet files, and curated tables must be real tables to upsert into.
+        View definitions cannot hold bound parameters, so the path is embedded as a
+        SQL string literal with single quotes doubled.
+        
         Args:
             parquet_path: Path to Parquet file
             table_name: Name of the table to create
             schema_name: Schema name (default: 'curated')
             if_exists: What to do if table exists ('replace', 'append', 'fail')
+            materialize: Copy rows into a table (default) or create a view over the file
+            indexes: Optional columns to build ART indexes on (materialized tables only)
         """
         parquet_path = Path(parquet_path)
         if not parquet_path.exists():
@@ -56,48 +120,78 @@ class DuckDBClient:
         
         full_table_name = f"{schema_name}.{table_name}"
         
+        # Check if table (or view) exists
+        existing = self.has_table(schema_name, table_name)
+        
         if if_exists == "replace":
-            self.execute(f"DROP TABLE IF EXISTS {full_table_name}")
+            if existing:
+                # Only look up the relation type when something actually has to be dropped
+                table_type = self.execute(
+                    "SELECT table_type FROM information_schema.tables "
+                    "WHERE table_schema = ? AND table_name = ?",
+                    [schema_name, table_name],
+                ).fetchone()[0]
+                drop_kind = "VIEW" if table_type == "VIEW" else "TABLE"
+                self.execute(f"DROP {drop_kind} {full_table_name}")
         elif if_exists == "fail":
-            # Check if table exists
-            result = self.execute(
-                f"SELECT COUNT(*) FROM information_schema.tables "
-                f"WHERE table_schema = '{schema_name}' AND table_name = '{table_name}'"
-            ).fetchone()
-            if result[0] > 0:
+            if existing:
                 raise ValueError(f"Table {full_table_name} already exists")
+        elif not materialize:
+            raise ValueError("Cannot append to a view; use materialize=True")
+        
+        if not materialize:
+            self.execute(
+                f"CREATE VIEW {full_table_name} AS "
+                f"SELECT * FROM read_parquet({_sql_literal(str(parquet_path.resolve()))})"
+            )
+            logger.info(f"Created view {full_table_name} over {parquet_path}")
+            return
         
         # Load Parquet file
         self.execute(
-            f"CREATE TABLE {full_table_name} AS SELECT * FROM read_parquet('{parquet_path}')"
+            f"CREATE TABLE {full_table_name} AS SELECT * FROM read_parquet(?)",
+            [str(parquet_path)],
         )
         
-        # Create indexes for common queries
-        try:
-            self.execute(f"CREATE INDEX IF NOT EXISTS idx_{table_name}_ticker ON {full_table_name}(ticker)")
-            if self._has_column(full_table_name, "date"):
-                self.execute(f"CREATE INDEX IF NOT EXISTS idx_{table_name}_date ON {full_table_name}(date)")
-        except Exception as exc:
-            logger.warning(f"Could not create indexes: {exc}")
+        # Zonemaps already cover ticker/date filters; only build indexes on request
+        for column in indexes or []:
+            if not self._has_column(full_table_name, column):
+                logger.warning(f"Skipping index on {full_table_name}.{column}: no such column")
+                continue
+            try:
+                self.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{table_name}_{column} ON {full_table_name}({column})"
+                )
+            except Exception as exc:
+                logger.warning(f"Could not create index on {full_table_name}.{column}: {exc}")
         
         row_count = self.execute(f"SELECT COUNT(*) FROM {full_table_name}").fetchone()[0]
         logger.info(f"Loaded {row_count} rows into {full_table_name} from {parquet_path}")
     
     def _has_column(self, table_name: str, column_name: str) -> bool:
         """Check if a table has a specific column."""
+        schema_name, _, bare_table = table_name.rpartition(".")
+        key = (schema_name or "main", bare_table, column_name)
+        if key in self._exists_cache:
+            return self._exists_cache[key]
         try:
             result = self.execute(
-                f"SELECT COUNT(*) FROM information_schema.columns "
-                f"WHERE table_name = '{table_name.split('.')[-1]}' "
-                f"AND column_name = '{column_name}'"
+                "SELECT COUNT(*) FROM information_schema.columns "
+                "WHERE table_schema = ? AND table_name = ? AND column_name = ?",
+                [key[0], bare_table, column_name],
             ).fetchone()
-            return result[0] > 0
         except Exception:
             return False
+        self._exists_cache[key] = result[0] > 0
+        return self._exists_cache[key]
     
-    def query(self, sql: str) -> list:
+    def query(self, sql: str, params: list | None = None) -> list:
         """Execute a query and return results as a list of tuples."""
-        return self.conn.execute(sql).fetchall()
+        return self.execute(sql, params).fetchall()
+    
+    def query_df(self, sql: str, params: list | None = None) -> pd.DataFrame:
+        """Execute a query and return results as a DataFrame built from DuckDB's columnar result."""
+        return self.execute(sql, params).fetch_df()
     
     def close(self) -> None:
         """Close the database connection."""
@@ -121,5 +215,31 @@ def get_db_path() -> Path:
     return db_dir / "mosaic.duckdb"
 
 
-__all__ = ["DuckDBClient", "get_db_path"]
+@contextmanager
+def shared_db(
+    db_path: Path | str | None = None,
+    db: DuckDBClient | None = None,
+    read_only: bool = False,
+) -> Iterator[DuckDBClient]:
+    """
+    Yield a DuckDB client that several loads can share.
+    
+    If an open client is passed in it is yielded unchanged and left open for its
+    owner. Otherwise a connection to db_path (or the default database) is opened
+    and closed on exit.
+    
+    Args:
+        db_path: Optional path to DuckDB database file
+        db: Optional already-open client to reuse
+        read_only: Open a new connection read-only (an existing client is used as is)
+    """
+    if db is not None:
+        yield db
+        return
+    
+    with DuckDBClient(db_path if db_path else get_db_path(), read_only=read_only) as client:
+        yield client
+
+
+__all__ = ["DuckDBClient", "get_db_path", "shared_db"]
 
@@ -4,67 +4,189 @@ from datetime import date
 from pathlib import Path
 from typing import Optional
 
+import pandas as pd
+
 from config.settings import get_settings
-from db.duckdb_client import DuckDBClient, get_db_path
+from db.compact import current_compacted_month
+from db.duckdb_client import DuckDBClient, shared_db
 from logging_utils.setup import logger
 from utils.dates import date_partition
 
 
+DAILY_PRICES_COLUMNS = """
+    date DATE,
+    open DOUBLE,
+    high DOUBLE,
+    low DOUBLE,
+    close DOUBLE,
+    volume BIGINT,
+    ticker VARCHAR,
+    source VARCHAR,
+    PRIMARY KEY (ticker, date)
+"""
+
+
+def _ensure_daily_prices_table(db: DuckDBClient, table_name: str = "daily_prices") -> None:
+    """
+    Create curated daily prices table keyed on (ticker, date).
+    
+    Tables created before the primary key existed are rebuilt once with the key so
+    that loads can upsert with a single INSERT OR REPLACE.
+    """
+    if not db.has_table("curated", table_name):
+        db.execute(f"CREATE TABLE curated.{table_name} ({DAILY_PRICES_COLUMNS})")
+        logger.info(f"Created table 'curated.{table_name}'")
+        return
+    
+    if db.has_primary_key(table_name, "curated"):
+        return
+    
+    logger.info(f"Migrating 'curated.{table_name}' to a (ticker, date) primary key")
+    staging_name = f"{table_name}__pk"
+    db.execute(f"DROP TABLE IF EXISTS curated.{staging_name}")
+    db.execute(f"CREATE TABLE curated.{staging_name} ({DAILY_PRICES_COLUMNS})")
+    db.execute(
+        f"INSERT INTO curated.{staging_name} BY NAME "
+        f"SELECT DISTINCT ON (ticker, date) * FROM curated.{table_name}"
+    )
+    db.execute(f"DROP TABLE curated.{table_name}")
+    db.execute(f"ALTER TABLE curated.{staging_name} RENAME TO {table_name}")
+
+
 def load_curated_prices_to_db(
     run_date: date,
     curated_dir: Path | None = None,
     db_path: Path | None = None,
     if_exists: str = "append",
+    db: DuckDBClient | None = None,
+    df: pd.DataFrame | None = None,
 ) -> None:
     """
     Load curated daily prices Parquet file into DuckDB.
     
     Uses append mode by default to accumulate historical data for feature calculation.
-    Duplicates are handled by using CREATE OR REPLACE for the date partition.
+    Rows are upserted on the (ticker, date) primary key, so reloading a date
+    replaces its rows in a single statement. 'replace' drops the whole table (all
+    dates) before loading, and 'fail' raises if the table already exists. When the caller still holds the curated
+    rows in memory, passing them as df loads them directly instead of re-reading and
+    decoding the Parquet file that was just written.
     
     Args:
         run_date: Date to load prices for
         curated_dir: Optional override for curated directory
         db_path: Optional override for DuckDB database path
         if_exists: What to do if table exists ('replace', 'append', 'fail'). Default: 'append'
+        db: Optional open client to reuse instead of connecting to db_path
+        df: Optional in-memory curated rows for run_date, loaded instead of the file
+    """
+    if if_exists not in ("replace", "append", "fail"):
+        raise ValueError(f"Invalid if_exists value: {if_exists!r}")
+    
+    if df is None:
+        settings = get_settings()
+        curated_root = Path(curated_dir) if curated_dir else settings.curated_dir
+        
+        partition = date_partition(run_date)
+        curated_file = curated_root / "daily_prices" / partition / f"{run_date:%Y-%m-%d}.parquet"
+        
+        if not curated_file.exists():
+            logger.warning(f"Curated prices file not found: {curated_file}")
+            return
+    
+    table_name = "daily_prices"
+    
+    with shared_db(db_path, db) as db:
+        db.create_schema("curated")
+        
+        if db.has_table("curated", table_name):
+            if if_exists == "fail":
+                raise ValueError(f"Table curated.{table_name} already exists")
+            if if_exists == "replace":
+                db.execute(f"DROP TABLE curated.{table_name}")
+        
+        _ensure_daily_prices_table(db, table_name)
+        
+        if df is None:
+            db.execute(
+                f"INSERT OR REPLACE INTO curated.{table_name} BY NAME "
+                f"SELECT * FROM read_parquet(?)",
+                [str(curated_file)],
+            )
+        else:
+            db.conn.register("curated_prices_df", df)
+            try:
+                db.execute(
+                    f"INSERT OR REPLACE INTO curated.{table_name} BY NAME "
+                    f"SELECT * FROM curated_prices_df"
+                )
+            finally:
+                db.conn.unregister("curated_prices_df")
+        logger.info(f"Upserted prices for {run_date} into DuckDB table 'curated.{table_name}'")
+
+
+def load_curated_prices_range_to_db(
+    start_date: date,
+    end_date: date,
+    curated_dir: Path | None = None,
+    db_path: Path | None = None,
+    db: DuckDBClient | None = None,
+) -> None:
+    """
+    Load every curated daily prices file between two dates into DuckDB in one statement.
+    
+    Intended for backfills: all files in the range are scanned by a single
+    read_parquet, so DuckDB plans once and parallelizes across files instead of
+    running one load per date. Completed months that have an up-to-date compacted
+    file (see db.compact) are read from that one file instead of their daily files.
+    
+    Args:
+        start_date: First date to load (inclusive)
+        end_date: Last date to load (inclusive)
+        curated_dir: Optional override for curated directory
+        db_path: Optional override for DuckDB database path
+        db: Optional open client to reuse instead of connecting to db_path
     """
     settings = get_settings()
     curated_root = Path(curated_dir) if curated_dir else settings.curated_dir
-    db_file = db_path if db_path else get_db_path()
+    prices_root = curated_root / "daily_prices"
     
-    partition = date_partition(run_date)
-    curated_file = curated_root / "daily_prices" / partition / f"{run_date:%Y-%m-%d}.parquet"
+    if not prices_root.exists():
+        logger.warning(f"Curated prices directory not found: {prices_root}")
+        return
     
-    if not curated_file.exists():
-        logger.warning(f"Curated prices file not found: {curated_file}")
+    # Partitions are laid out as YYYY/MM/DD/YYYY-MM-DD.parquet; only months that
+    # overlap the range are listed
+    files: list[str] = []
+    year, month = start_date.year, start_date.month
+    while (year, month) <= (end_date.year, end_date.month):
+        compacted = current_compacted_month(year, month, curated_root)
+        if compacted is not None:
+            files.append(str(compacted))
+        else:
+            month_dir = prices_root / f"{year:04d}" / f"{month:02d}"
+            if month_dir.exists():
+                files.extend(str(f) for f in sorted(month_dir.glob("*/*.parquet")))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    
+    if not files:
+        logger.warning(f"No curated price files between {start_date} and {end_date}")
         return
     
     table_name = "daily_prices"
     
-    with DuckDBClient(db_file) as db:
+    with shared_db(db_path, db) as db:
         db.create_schema("curated")
+        _ensure_daily_prices_table(db, table_name)
         
-        # If table doesn't exist, create it
-        result = db.query(
-            f"SELECT COUNT(*) FROM information_schema.tables "
-            f"WHERE table_schema = 'curated' AND table_name = '{table_name}'"
+        db.execute(
+            f"INSERT OR REPLACE INTO curated.{table_name} BY NAME "
+            f"SELECT * FROM read_parquet(?, union_by_name = true) "
+            f"WHERE date BETWEEN ? AND ?",
+            [files, start_date, end_date],
+        )
+        logger.info(
+            f"Upserted prices for {start_date} to {end_date} into DuckDB table 'curated.{table_name}'"
         )
-        
-        if result[0][0] == 0:
-            # Create table from first file
-            db.load_parquet_to_table(curated_file, table_name, schema_name="curated", if_exists="replace")
-            logger.info(f"Created table and loaded prices for {run_date}")
-        else:
-            # Append mode: delete existing data for this date, then insert new
-            # This handles updates while preserving historical data
-            db.execute(
-                f"DELETE FROM curated.{table_name} WHERE date = '{run_date}'"
-            )
-            # Insert new data
-            db.execute(
-                f"INSERT INTO curated.{table_name} SELECT * FROM read_parquet('{curated_file}')"
-            )
-            logger.info(f"Upserted prices for {run_date} into DuckDB table 'curated.{table_name}'")
 
 
 def load_curated_fundamentals_to_db(
@@ -72,6 +194,7 @@ def load_curated_fundamentals_to_db(
     curated_dir: Path | None = None,
     db_path: Path | None = None,
     if_exists: str = "append",
+    db: DuckDBClient | None = None,
 ) -> None:
     """
     Load curated quarterly fundamentals Parquet file into DuckDB.
@@ -81,10 +204,10 @@ def load_curated_fundamentals_to_db(
         curated_dir: Optional override for curated directory
         db_path: Optional override for DuckDB database path
         if_exists: What to do if table exists ('replace', 'append', 'fail')
+        db: Optional open client to reuse instead of connecting to db_path
     """
     settings = get_settings()
     curated_root = Path(curated_dir) if curated_dir else settings.curated_dir
-    db_file = db_path if db_path else get_db_path()
     
     year = f"{run_date:%Y}"
     quarter = f"Q{(run_date.month - 1) // 3 + 1}"
@@ -96,10 +219,14 @@ def load_curated_fundamentals_to_db(
     
     table_name = "quarterly_fundamentals"
     
-    with DuckDBClient(db_file) as db:
+    with shared_db(db_path, db) as db:
         db.load_parquet_to_table(curated_file, table_name, if_exists=if_exists)
         logger.info(f"Loaded fundamentals for {year}/{quarter} into DuckDB table '{table_name}'")
 
 
-__all__ = ["load_curated_prices_to_db", "load_curated_fundamentals_to_db"]
+__all__ = [
+    "load_curated_prices_to_db",
+    "load_curated_prices_range_to_db",
+    "load_curated_fundamentals_to_db",
+]
 
@@ -4,15 +4,78 @@ from datetime import date
 from pathlib import Path
 from typing import Optional
 
-from db.duckdb_client import DuckDBClient, get_db_path
+import duckdb
+
+from db.duckdb_client import DuckDBClient, shared_db
 from logging_utils.setup import logger
 
 
+def _replace_date_from_parquet(
+    db: DuckDBClient, parquet_path: Path, table_name: str, as_of_date: date
+) -> None:
+    """
+    Swap one date's rows in a marts table for the contents of a Parquet file.
+    
+    The delete and the insert straight from read_parquet run in one transaction, so
+    other dates are kept and readers never see the date half-loaded. If the file's
+    columns no longer fit the table, the table is rebuilt (also in one transaction)
+    as the union by column name of the other dates' rows and the file, so history
+    is kept and columns missing on either side become NULL.
+    """
+    full_table_name = f"marts.{table_name}"
+    if not db.has_table("marts", table_name):
+        db.load_parquet_to_table(parquet_path, table_name, schema_name="marts")
+        return
+    
+    db.execute("BEGIN TRANSACTION")
+    try:
+        db.execute(f"DELETE FROM {full_table_name} WHERE date = ?", [as_of_date])
+        db.execute(
+            f"INSERT INTO {full_table_name} BY NAME SELECT * FROM read_parquet(?)",
+            [str(parquet_path)],
+        )
+        db.execute("COMMIT")
+    except (duckdb.BinderException, duckdb.ConversionException) as exc:
+        db.execute("ROLLBACK")
+        logger.warning(
+            f"Schema of {parquet_path} does not match {full_table_name}, "
+            f"rebuilding it with the existing rows: {exc}"
+        )
+        _rebuild_with_parquet(db, parquet_path, table_name, as_of_date)
+    except Exception:
+        db.execute("ROLLBACK")
+        raise
+
+
+def _rebuild_with_parquet(
+    db: DuckDBClient, parquet_path: Path, table_name: str, as_of_date: date
+) -> None:
+    """Rebuild a marts table as its other dates' rows unioned by name with a Parquet file."""
+    full_table_name = f"marts.{table_name}"
+    staging_name = f"{table_name}__rebuild"
+    db.execute("BEGIN TRANSACTION")
+    try:
+        db.execute(f"DROP TABLE IF EXISTS marts.{staging_name}")
+        db.execute(
+            f"CREATE TABLE marts.{staging_name} AS "
+            f"SELECT * FROM {full_table_name} WHERE date <> ? "
+            f"UNION ALL BY NAME SELECT * FROM read_parquet(?)",
+            [as_of_date, str(parquet_path)],
+        )
+        db.execute(f"DROP TABLE {full_table_name}")
+        db.execute(f"ALTER TABLE marts.{staging_name} RENAME TO {table_name}")
+        db.execute("COMMIT")
+    except Exception:
+        db.execute("ROLLBACK")
+        raise
+
+
 def load_signal_scores_to_db(
     as_of_date: date,
     signal_scores_file: Path | None = None,
     db_path: Path | None = None,
     if_exists: str = "replace",
+    db: DuckDBClient | None = None,
 ) -> None:
     """
     Load signal scores Parquet file into DuckDB.
@@ -21,12 +84,13 @@ def load_signal_scores_to_db(
         as_of_date: Date of the signal scores
         signal_scores_file: Optional path to signal scores Parquet file
         db_path: Optional override for DuckDB database path
-        if_exists: What to do if table exists ('replace', 'append', 'fail')
+        if_exists: What to do if table exists ('replace' swaps this date's rows,
+            'append', 'fail')
+        db: Optional open client to reuse instead of connecting to db_path
     """
     from config.settings import get_settings
     
     settings = get_settings()
-    db_file = db_path if db_path else get_db_path()
     
     if signal_scores_file is None:
         signal_scores_file = (
@@ -35,7 +99,7 @@ def load_signal_scores_to_db(
     
     table_name = "signal_scores"
     
-    with DuckDBClient(db_file) as db:
+    with shared_db(db_path, db) as db:
         db.create_schema("marts")
         
         if not signal_scores_file.exists():
@@ -49,11 +113,14 @@ def load_signal_scores_to_db(
                 )
             """)
             if if_exists == "replace":
-                db.execute(f"DELETE FROM marts.{table_name} WHERE date = '{as_of_date}'")
+                db.execute(f"DELETE FROM marts.{table_name} WHERE date = ?", [as_of_date])
             logger.info(f"Created empty table 'marts.{table_name}'")
         else:
             # Load from Parquet file
-            db.load_parquet_to_table(signal_scores_file, table_name, schema_name="marts", if_exists=if_exists)
+            if if_exists == "replace":
+                _replace_date_from_parquet(db, signal_scores_file, table_name, as_of_date)
+            else:
+                db.load_parquet_to_table(signal_scores_file, table_name, schema_name="marts", if_exists=if_exists)
             logger.info(f"Loaded signal scores for {as_of_date} into DuckDB table 'marts.{table_name}'")
 
 
@@ -62,6 +129,7 @@ def load_positions_to_db(
     positions_file: Path | None = None,
     db_path: Path | None = None,
     if_exists: str = "replace",
+    db: DuckDBClient | None = None,
 ) -> None:
     """
     Load positions Parquet file into DuckDB.
@@ -70,19 +138,20 @@ def load_positions_to_db(
         as_of_date: Date of the positions
         positions_file: Optional path to positions Parquet file
         db_path: Optional override for DuckDB database path
-        if_exists: What to do if table exists ('replace', 'append', 'fail')
+        if_exists: What to do if table exists ('replace' swaps this date's rows,
+            'append', 'fail')
+        db: Optional open client to reuse instead of connecting to db_path
     """
     from config.settings import get_settings
     
     settings = get_settings()
-    db_file = db_path if db_path else get_db_path()
     
     if positions_file is None:
         positions_file = settings.marts_dir / "positions" / f"{as_of_date:%Y-%m-%d}.parquet"
     
     table_name = "positions"
     
-    with DuckDBClient(db_file) as db:
+    with shared_db(db_path, db) as db:
         db.create_schema("marts")
         
         if not positions_file.exists():
@@ -98,11 +167,14 @@ def load_positions_to_db(
                 )
             """)
             if if_exists == "replace":
-                db.execute(f"DELETE FROM marts.{table_name} WHERE date = '{as_of_date}'")
+                db.execute(f"DELETE FROM marts.{table_name} WHERE date = ?", [as_of_date])
             logger.info(f"Created empty table 'marts.{table_name}'")
         else:
             # Load from Parquet file
-            db.load_parquet_to_table(positions_file, table_name, schema_name="marts", if_exists=if_exists)
+            if if_exists == "replace":
+                _replace_date_from_parquet(db, positions_file, table_name, as_of_date)
+            else:
+                db.load_parquet_to_table(positions_file, table_name, schema_name="marts", if_exists=if_exists)
             logger.info(f"Loaded positions for {as_of_date} into DuckDB table 'marts.{table_name}'")
 
 
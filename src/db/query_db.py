@@ -15,25 +15,30 @@ def list_tables(db_path: Path | None = None) -> None:
     db_file = db_path if db_path else get_db_path()
     
     if not db_file.exists():
-        logger.error(f"Database file not found: {db_file}")
+        logger.error("Database file not found: {}", db_file)
         return
     
     with DuckDBClient(db_file) as db:
-        # List all tables in curated schema
+        # Row counts come from catalog metadata, so no table is scanned
         tables = db.query(
-            "SELECT table_name FROM information_schema.tables "
-            "WHERE table_schema = 'curated' ORDER BY table_name"
+            "SELECT table_name, estimated_size FROM duckdb_tables() "
+            "WHERE schema_name = 'curated' "
+            "UNION ALL "
+            "SELECT view_name, NULL FROM duckdb_views() "
+            "WHERE schema_name = 'curated' AND NOT internal "
+            "ORDER BY 1"
         )
         
         if not tables:
             logger.info("No tables found in 'curated' schema")
             return
         
-        logger.info(f"Found {len(tables)} table(s) in 'curated' schema:")
-        for table in tables:
-            table_name = table[0]
-            row_count = db.query(f"SELECT COUNT(*) FROM curated.{table_name}")[0][0]
-            logger.info(f"  - {table_name}: {row_count} rows")
+        logger.info("Found {} table(s) in 'curated' schema:", len(tables))
+        for table_name, row_count in tables:
+            if row_count is None:
+                logger.info("  - {}: view", table_name)
+            else:
+                logger.info("  - {}: ~{} rows", table_name, row_count)
 
 
 def show_table_info(table_name: str, db_path: Path | None = None, limit: int = 10) -> None:
@@ -41,52 +46,43 @@ def show_table_info(table_name: str, db_path: Path | None = None, limit: int = 1
     db_file = db_path if db_path else get_db_path()
     
     if not db_file.exists():
-        logger.error(f"Database file not found: {db_file}")
+        logger.error("Database file not found: {}", db_file)
         return
     
     with DuckDBClient(db_file) as db:
-        # Check if table exists
-        result = db.query(
-            f"SELECT COUNT(*) FROM information_schema.tables "
-            f"WHERE table_schema = 'curated' AND table_name = '{table_name}'"
+        # One catalog lookup gives the columns and doubles as the existence check that
+        # whitelists table_name for the queries below
+        columns = db.query(
+            "SELECT column_name, data_type FROM duckdb_columns() "
+            "WHERE schema_name = 'curated' AND table_name = ? "
+            "ORDER BY column_index",
+            [table_name],
         )
         
-        if result[0][0] == 0:
-            logger.error(f"Table 'curated.{table_name}' not found")
+        if not columns:
+            logger.error("Table 'curated.{}' not found", table_name)
             return
         
         # Get row count
         row_count = db.query(f"SELECT COUNT(*) FROM curated.{table_name}")[0][0]
-        logger.info(f"Table: curated.{table_name}")
-        logger.info(f"Total rows: {row_count}")
+        logger.info("Table: curated.{}", table_name)
+        logger.info("Total rows: {}", row_count)
         
         if row_count == 0:
             logger.warning("Table is empty")
             return
         
-        # Get column info
-        columns = db.query(
-            f"SELECT column_name, data_type FROM information_schema.columns "
-            f"WHERE table_schema = 'curated' AND table_name = '{table_name}' "
-            f"ORDER BY ordinal_position"
-        )
-        
         logger.info("\nColumns:")
         for col_name, col_type in columns:
-            logger.info(f"  - {col_name}: {col_type}")
+            logger.info("  - {}: {}", col_name, col_type)
         
         # Show sample data
-        logger.info(f"\nSample data (first {limit} rows):")
-        sample = db.query(f"SELECT * FROM curated.{table_name} LIMIT {limit}")
+        logger.info("\nSample data (first {} rows):", limit)
+        sample = db.query_df(f"SELECT * FROM curated.{table_name} LIMIT ?", [limit])
         
-        if sample:
-            # Get column names
-            col_names = [col[0] for col in columns]
-            logger.info("  " + " | ".join(col_names))
-            logger.info("  " + "-" * 60)
-            
-            for row in sample:
-                logger.info("  " + " | ".join(str(val) for val in row))
+        if not sample.empty:
+            for line in sample.to_string(index=False).splitlines():
+                logger.info("  {}", line)
 
 
 def run_query(query: str, db_path: Path | None = None) -> None:
@@ -94,21 +90,21 @@ def run_query(query: str, db_path: Path | None = None) -> None:
     db_file = db_path if db_path else get_db_path()
     
     if not db_file.exists():
-        logger.error(f"Database file not found: {db_file}")
+        logger.error("Database file not found: {}", db_file)
         return
     
     with DuckDBClient(db_file) as db:
         try:
-            results = db.query(query)
+            results = db.query_df(query)
             
-            if results:
-                logger.info(f"Query returned {len(results)} row(s):")
-                for row in results:
-                    logger.info(f"  {row}")
+            if not results.empty:
+                logger.info("Query returned {} row(s):", len(results))
+                for line in results.to_string(index=False).splitlines():
+                    logger.info("  {}", line)
             else:
                 logger.info("Query returned no results")
         except Exception as exc:
-            logger.error(f"Query failed: {exc}")
+            logger.error("Query failed: {}", exc)
 
 
 def main(argv: list[str] | None = None) -> None:
@@ -32,8 +32,9 @@ def calculate_yoy_revenue_growth_proxy(
     # TODO: Parse SEC filings to extract revenue data
     # For now, return empty DataFrame as placeholder
     logger.info(
-        f"Fundamental features not yet implemented - would calculate YoY revenue growth "
-        f"by parsing SEC filings for {as_of_date}"
+        "Fundamental features not yet implemented - would calculate YoY revenue growth "
+        "by parsing SEC filings for {}",
+        as_of_date,
     )
     
     return pd.DataFrame(columns=["ticker", "date", "yoy_revenue_growth_proxy"])
@@ -4,12 +4,30 @@ from datetime import date
 from pathlib import Path
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 
 from config.settings import get_settings
 from db.duckdb_client import DuckDBClient, get_db_path
 from logging_utils.setup import logger
-from utils.paths import ensure_dir
+from utils.paths import DICTIONARY_COLUMNS, ensure_dir, write_parquet
+
+
+def _smallest_k(values: np.ndarray, k: int) -> np.ndarray:
+    """
+    Return indices of the k smallest values in ascending order.
+    
+    Ties keep their original row order, matching DataFrame.nsmallest(keep="first").
+    """
+    k = max(min(k, len(values)), 0)
+    if k == 0:
+        return np.empty(0, dtype=np.intp)
+    # Partition for the k-th smallest value, then fill any ties at that boundary in row order
+    kth = values[np.argpartition(values, k - 1)[k - 1]]
+    below = np.flatnonzero(values < kth)
+    ties = np.flatnonzero(values == kth)[: k - len(below)]
+    idx = np.sort(np.concatenate([below, ties]))
+    return idx[np.argsort(values[idx], kind="stable")]
 
 
 def generate_positions(
@@ -36,39 +54,46 @@ def generate_positions(
     """
     # Check if DataFrame has required columns
     if signals_df.empty or "date" not in signals_df.columns or signal_col not in signals_df.columns:
-        logger.warning(f"No valid signals found for {as_of_date} (empty or missing columns)")
+        logger.warning("No valid signals found for {} (empty or missing columns)", as_of_date)
         return pd.DataFrame(columns=["ticker", "date", "position_type", signal_col, "rank"])
     
-    # Filter to date and valid signals
-    date_signals = signals_df[
-        (signals_df["date"] == pd.Timestamp(as_of_date)) & (signals_df[signal_col].notna())
-    ].copy()
+    # Filter to date and valid signals; compare as datetime64 so the mask is a plain
+    # integer comparison rather than an object-dtype one
+    as_of_ts = pd.Timestamp(as_of_date)
+    signal_dates = signals_df["date"]
+    if not pd.api.types.is_datetime64_any_dtype(signal_dates):
+        signal_dates = pd.to_datetime(signal_dates)
+    date_signals = signals_df[(signal_dates == as_of_ts) & (signals_df[signal_col].notna())]
     
     if date_signals.empty:
-        logger.warning(f"No valid signals found for {as_of_date}")
+        logger.warning("No valid signals found for {}", as_of_date)
         return pd.DataFrame()
     
-    # Sort by signal score
-    date_signals = date_signals.sort_values(signal_col, ascending=False).reset_index(drop=True)
-    
-    positions = []
-    
-    # Top N longs
-    longs = date_signals.head(n_longs).copy()
-    longs["position_type"] = "long"
-    longs["rank"] = range(1, len(longs) + 1)
-    positions.append(longs[["ticker", "date", "position_type", signal_col, "rank"]])
-    
-    # Bottom N shorts
-    shorts = date_signals.tail(n_shorts).copy()
-    shorts["position_type"] = "short"
-    shorts["rank"] = range(1, len(shorts) + 1)
-    positions.append(shorts[["ticker", "date", "position_type", signal_col, "rank"]])
-    
-    positions_df = pd.concat(positions, ignore_index=True)
+    # Partition out the extremes instead of sorting the whole universe, then build
+    # the positions frame in one go from the selected row indices
+    scores = date_signals[signal_col].to_numpy(dtype="float64")
+    long_idx = _smallest_k(-scores, n_longs)
+    # Shorts are kept in descending signal order
+    short_idx = _smallest_k(scores, n_shorts)[::-1]
+    idx = np.concatenate([long_idx, short_idx])
+    
+    positions_df = pd.DataFrame(
+        {
+            "ticker": date_signals["ticker"].array.take(idx),
+            "date": date_signals["date"].array.take(idx),
+            "position_type": np.repeat(["long", "short"], [len(long_idx), len(short_idx)]),
+            signal_col: scores[idx],
+            "rank": np.concatenate(
+                [np.arange(1, len(long_idx) + 1), np.arange(1, len(short_idx) + 1)]
+            ),
+        }
+    )
     
     logger.info(
-        f"Generated {len(longs)} long and {len(shorts)} short positions for {as_of_date}"
+        "Generated {} long and {} short positions for {}",
+        len(long_idx),
+        len(short_idx),
+        as_of_date,
     )
     
     return positions_df
@@ -102,10 +127,10 @@ def save_positions(
     if positions_df.empty:
         # Create empty DataFrame with expected schema
         positions_df = pd.DataFrame(columns=["ticker", "date", "position_type", "signal_score", "rank"])
-        logger.warning(f"Saving empty positions file for {as_of_date}")
+        logger.warning("Saving empty positions file for {}", as_of_date)
     
-    positions_df.to_parquet(output_path, index=False)
-    logger.info(f"Saved positions to {output_path} ({len(positions_df)} rows)")
+    write_parquet(positions_df, output_path, use_dictionary=DICTIONARY_COLUMNS)
+    logger.info("Saved positions to {} ({} rows)", output_path, len(positions_df))
     
     return output_path
 
@@ -127,23 +152,15 @@ def load_positions_from_db(
     db_file = db_path if db_path else get_db_path()
     
     with DuckDBClient(db_file) as db:
-        query = f"""
-        SELECT * FROM marts.positions
-        WHERE date = '{as_of_date}'
-        ORDER BY position_type, rank
-        """
-        
-        positions = db.query(query)
-        
-        if not positions:
-            logger.warning(f"No positions found in database for {as_of_date}")
-            return pd.DataFrame()
-        
-        positions_df = pd.DataFrame(
-            positions,
-            columns=["ticker", "date", "position_type", "signal_score", "rank"],
+        positions_df = db.query_df(
+            "SELECT * FROM marts.positions WHERE date = ? ORDER BY position_type, rank",
+            [as_of_date],
         )
     
+    if positions_df.empty:
+        logger.warning("No positions found in database for {}", as_of_date)
+        return pd.DataFrame()
+    
     return positions_df
 
 
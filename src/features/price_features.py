@@ -1,15 +1,53 @@
 from __future__ import annotations
 
-from datetime import date
+from datetime import date, timedelta
 from pathlib import Path
 from typing import Optional
 
 import pandas as pd
 
-from db.duckdb_client import DuckDBClient, get_db_path
+from db.duckdb_client import DuckDBClient, shared_db
 from logging_utils.setup import logger
 
 
+# One pass per ticker: collect closes newest-first, then derive every feature from
+# that list. Tickers with under 60 days of history (needed for momentum) are dropped
+# before anything reaches pandas; flat 5-day windows give a NULL z-score
+PRICE_FEATURES_SQL = """
+WITH history AS (
+    SELECT
+        ticker,
+        COUNT(*) AS n_obs,
+        LIST(close ORDER BY date DESC) AS closes
+    FROM curated.daily_prices
+    WHERE date BETWEEN ? AND ?
+    GROUP BY ticker
+    HAVING COUNT(*) >= 60
+)
+SELECT
+    ticker,
+    list_stddev_samp(
+        list_transform(closes[1:20], (c, i) -> c / closes[i + 1] - 1)
+    ) * SQRT(252) AS realized_vol_20d,
+    CASE WHEN n_obs >= 61 THEN closes[1] / closes[61] - 1 END AS momentum_60d,
+    (closes[1] - list_avg(closes[1:5])) / NULLIF(list_stddev_samp(closes[1:5]), 0)
+        AS mean_reversion_zscore_5d
+FROM history
+ORDER BY ticker
+"""
+
+# Returned when there is nothing to compute, so callers still see the full schema
+EMPTY_FEATURES_FRAME = pd.DataFrame(
+    {
+        "ticker": pd.Series(dtype="category"),
+        "date": pd.Series(dtype="object"),
+        "realized_vol_20d": pd.Series(dtype="float64"),
+        "momentum_60d": pd.Series(dtype="float64"),
+        "mean_reversion_zscore_5d": pd.Series(dtype="float64"),
+    }
+)
+
+
 def calculate_realized_volatility(
     prices_df: pd.DataFrame, window: int = 20, price_col: str = "close"
 ) -> pd.Series:
@@ -71,6 +109,7 @@ def calculate_price_features(
     as_of_date: date,
     db_path: Path | None = None,
     lookback_days: int = 100,
+    db: DuckDBClient | None = None,
 ) -> pd.DataFrame:
     """
     Calculate all price features for all tickers as of a given date.
@@ -84,68 +123,28 @@ def calculate_price_features(
         as_of_date: Date to calculate features as of
         db_path: Optional path to DuckDB database
         lookback_days: Number of days of history to fetch (default: 100)
+        db: Optional open client to reuse instead of connecting to db_path
         
     Returns:
         DataFrame with columns: ticker, date, realized_vol_20d, momentum_60d, mean_reversion_zscore_5d
     """
-    db_file = db_path if db_path else get_db_path()
-    
-    with DuckDBClient(db_file) as db:
-        # Fetch price history for all tickers
-        start_date = pd.Timestamp(as_of_date) - pd.Timedelta(days=lookback_days)
-        
-        query = f"""
-        SELECT 
-            ticker,
-            date,
-            close
-        FROM curated.daily_prices
-        WHERE date >= '{start_date.date()}'
-          AND date <= '{as_of_date}'
-        ORDER BY ticker, date
-        """
-        
-        prices_df = pd.DataFrame(db.query(query), columns=["ticker", "date", "close"])
+    start_date = as_of_date - timedelta(days=lookback_days)
     
-    if prices_df.empty:
-        logger.warning(f"No price data found for date range ending {as_of_date}")
-        return pd.DataFrame()
+    # Compute every feature inside DuckDB and return only each ticker's as-of row
+    with shared_db(db_path, db) as client:
+        features_df = client.query_df(PRICE_FEATURES_SQL, [start_date, as_of_date])
     
-    # Calculate features for each ticker
-    feature_rows = []
+    if features_df.empty:
+        logger.warning(
+            "No tickers with 60 days of price history for date range ending {}", as_of_date
+        )
+        return EMPTY_FEATURES_FRAME.copy()
     
-    for ticker in prices_df["ticker"].unique():
-        ticker_prices = prices_df[prices_df["ticker"] == ticker].copy()
-        ticker_prices = ticker_prices.sort_values("date").reset_index(drop=True)
-        
-        # Need at least 60 days for momentum, but we can still calculate other features with less
-        if len(ticker_prices) < 60:
-            logger.debug(
-                f"Insufficient data for {ticker} (need 60 days for momentum, have {len(ticker_prices)}). "
-                f"Skipping this ticker."
-            )
-            continue
-        
-        # Calculate features
-        realized_vol = calculate_realized_volatility(ticker_prices, window=20)
-        momentum = calculate_momentum(ticker_prices, window=60)
-        zscore = calculate_mean_reversion_zscore(ticker_prices, window=5)
-        
-        # Get the latest values (as of as_of_date)
-        # Convert date column to datetime if needed for comparison
-        ticker_prices["date"] = pd.to_datetime(ticker_prices["date"])
-        latest_idx = ticker_prices[ticker_prices["date"] <= pd.Timestamp(as_of_date)].index[-1]
-        
-        feature_rows.append({
-            "ticker": ticker,
-            "date": as_of_date,
-            "realized_vol_20d": realized_vol.iloc[latest_idx] if pd.notna(realized_vol.iloc[latest_idx]) else None,
-            "momentum_60d": momentum.iloc[latest_idx] if pd.notna(momentum.iloc[latest_idx]) else None,
-            "mean_reversion_zscore_5d": zscore.iloc[latest_idx] if pd.notna(zscore.iloc[latest_idx]) else None,
-        })
+    features_df.insert(1, "date", as_of_date)
+    # Categorical tickers keep downstream groupby/merge keys small and cheap to hash
+    features_df["ticker"] = features_df["ticker"].astype("category")
     
-    features_df = pd.DataFrame(feature_rows)
-    logger.info(f"Calculated price features for {len(features_df)} tickers as of {as_of_date}")
+    logger.info("Calculated price features for {} tickers as of {}", len(features_df), as_of_date)
     
     return features_df
 
@@ -1,14 +1,18 @@
 from __future__ import annotations
 
+import hashlib
 from datetime import date
 from pathlib import Path
 from typing import Optional
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 from config.settings import get_settings
 from logging_utils.setup import logger
-from utils.paths import ensure_dir
+from utils.paths import DICTIONARY_COLUMNS, ensure_dir, write_parquet, write_parquet_table
 
 
 def normalize_to_zscore(df: pd.DataFrame, value_col: str, group_col: str = "date") -> pd.Series:
@@ -30,10 +34,36 @@ def normalize_to_zscore(df: pd.DataFrame, value_col: str, group_col: str = "date
     return zscores
 
 
+def _signals_cache_key(
+    price_features_df: pd.DataFrame,
+    fundamental_features_df: pd.DataFrame | None,
+    as_of_date: date | None,
+) -> str:
+    """
+    Hash the scoring inputs into a stable cache key.
+    
+    Covers column names and row contents of both feature frames plus the as-of date,
+    so any change to the inputs produces a different key.
+    """
+    digest = hashlib.sha256(str(as_of_date).encode())
+    for df in (price_features_df, fundamental_features_df):
+        if df is None or df.empty:
+            digest.update(b"<none>")
+            continue
+        digest.update("\x1f".join(map(str, df.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+# Parquet schema metadata entry holding the input hash of a cached result
+_CACHE_KEY_METADATA = b"mosaic.signals_key"
+
+
 def score_signals(
     price_features_df: pd.DataFrame,
     fundamental_features_df: pd.DataFrame | None = None,
     as_of_date: date | None = None,
+    cache_dir: Path | None = None,
 ) -> pd.DataFrame:
     """
     Create a standardized signal score table by normalizing features to Z-scores.
@@ -45,6 +75,9 @@ def score_signals(
         price_features_df: DataFrame with price features (must have 'date' and 'ticker' columns)
         fundamental_features_df: Optional DataFrame with fundamental features
         as_of_date: Optional date to filter to (if None, uses all dates in price_features_df)
+        cache_dir: Optional directory for memoized results; when set, the result for
+            identical inputs is read back instead of being recomputed. One file is
+            kept per as-of date and overwritten when its inputs change
         
     Returns:
         DataFrame with columns:
@@ -56,12 +89,23 @@ def score_signals(
         logger.warning("Empty price features DataFrame provided")
         return pd.DataFrame()
     
+    cache_path = None
+    if cache_dir is not None:
+        key = _signals_cache_key(price_features_df, fundamental_features_df, as_of_date)
+        cache_name = f"{pd.Timestamp(as_of_date):%Y-%m-%d}" if as_of_date else "all"
+        cache_path = Path(cache_dir) / f"signals_{cache_name}.parquet"
+        if cache_path.exists():
+            cached_key = (pq.read_schema(cache_path).metadata or {}).get(_CACHE_KEY_METADATA)
+            if cached_key == key.encode():
+                logger.info("Using cached signal scores from {}", cache_path)
+                return pd.read_parquet(cache_path)
+    
     # Filter to specific date if provided
     if as_of_date:
         price_features_df = price_features_df[price_features_df["date"] == as_of_date].copy()
     
     if price_features_df.empty:
-        logger.warning(f"No price features found for date {as_of_date}")
+        logger.warning("No price features found for date {}", as_of_date)
         return pd.DataFrame()
     
     # Get feature columns (exclude ticker and date)
@@ -71,23 +115,18 @@ def score_signals(
         logger.warning("No feature columns found in price_features_df")
         return pd.DataFrame()
     
-    # Normalize each feature to Z-score across universe per date
-    signals_df = price_features_df[["ticker", "date"]].copy()
-    
     for feature_col in feature_cols:
-        # Only normalize non-null values
-        mask = price_features_df[feature_col].notna()
-        if mask.sum() == 0:
-            logger.warning(f"All values are null for feature {feature_col}")
-            signals_df[f"{feature_col}_zscore"] = None
-            continue
-        
-        # Calculate Z-score within each date group
-        zscore_col = f"{feature_col}_zscore"
-        signals_df[zscore_col] = None
-        signals_df.loc[mask, zscore_col] = normalize_to_zscore(
-            price_features_df[mask], feature_col, group_col="date"
-        )
+        if price_features_df[feature_col].isna().all():
+            logger.warning("All values are null for feature {}", feature_col)
+    
+    # Normalize every feature to Z-score across universe per date in one grouped pass;
+    # group mean/std skip nulls, so null inputs simply stay null
+    features = price_features_df[feature_cols]
+    grouped = features.groupby(price_features_df["date"])
+    zscores = (features - grouped.transform("mean")) / grouped.transform("std")
+    signals_df = pd.concat(
+        [price_features_df[["ticker", "date"]], zscores.add_suffix("_zscore")], axis=1
+    )
     
     # Merge fundamental features if provided
     if fundamental_features_df is not None and not fundamental_features_df.empty:
@@ -112,12 +151,10 @@ def score_signals(
             ]
             for feature_col in fund_feature_cols:
                 mask = signals_df[feature_col].notna()
-                if mask.sum() > 0:
-                    zscore_col = f"{feature_col}_zscore"
-                    signals_df[zscore_col] = None
-                    signals_df.loc[mask, zscore_col] = normalize_to_zscore(
-                        signals_df[mask], feature_col, group_col="date"
-                    )
+                if mask.any():
+                    # Assign the whole column at once so it stays float64 instead of object
+                    zscores = normalize_to_zscore(signals_df, feature_col, group_col="date")
+                    signals_df[f"{feature_col}_zscore"] = zscores.where(mask).astype("float64")
     
     # Calculate composite signal score (equal-weighted average of Z-scores)
     zscore_cols = [col for col in signals_df.columns if col.endswith("_zscore")]
@@ -127,13 +164,22 @@ def score_signals(
         signals_df["signal_score"] = signals_df[zscore_cols].mean(axis=1)
     else:
         logger.warning("No Z-score columns found, signal_score will be null")
-        signals_df["signal_score"] = None
+        signals_df["signal_score"] = np.nan
     
     logger.info(
-        f"Created signal scores for {len(signals_df)} tickers "
-        f"on {signals_df['date'].nunique()} date(s)"
+        "Created signal scores for {} tickers on {} date(s)",
+        len(signals_df),
+        signals_df["date"].nunique(),
     )
     
+    if cache_path is not None:
+        ensure_dir(cache_path.parent)
+        table = pa.Table.from_pandas(signals_df, preserve_index=False)
+        table = table.replace_schema_metadata(
+            {**(table.schema.metadata or {}), _CACHE_KEY_METADATA: key.encode()}
+        )
+        write_parquet_table(table, cache_path)
+    
     return signals_df
 
 
@@ -165,10 +211,10 @@ def save_signal_scores(
     if signals_df.empty:
         # Create empty DataFrame with expected schema
         signals_df = pd.DataFrame(columns=["ticker", "date", "signal_score"])
-        logger.warning(f"Saving empty signal scores file for {as_of_date}")
+        logger.warning("Saving empty signal scores file for {}", as_of_date)
     
-    signals_df.to_parquet(output_path, index=False)
-    logger.info(f"Saved signal scores to {output_path} ({len(signals_df)} rows)")
+    write_parquet(signals_df, output_path, use_dictionary=DICTIONARY_COLUMNS)
+    logger.info("Saved signal scores to {} ({} rows)", output_path, len(signals_df))
     
     return output_path
 
@@ -2,11 +2,14 @@ from __future__ import annotations
 
 import argparse
 import sys
+from datetime import date
 from typing import Optional
 
 import pandas as pd
 from prefect import flow, task
 
+from config.settings import get_settings
+from db.duckdb_client import get_db_path, shared_db
 from db.load_marts import load_positions_to_db, load_signal_scores_to_db
 from features.fundamental_features import calculate_yoy_revenue_growth_proxy
 from features.position_generator import generate_positions, save_positions
@@ -16,17 +19,17 @@ from logging_utils.setup import configure_logging, logger
 from utils.dates import parse_run_date
 
 
-@task
-def calculate_features(run_date_str: str):
+@task(persist_result=False)
+def calculate_features(run_dt: date):
     """Task to calculate price and fundamental features."""
-    from datetime import date
+    logger.info("Calculating features for {}", run_dt)
     
-    run_dt = parse_run_date(run_date_str)
-    
-    logger.info(f"Calculating features for {run_dt}")
-    
-    # Calculate price features
-    price_features = calculate_price_features(run_dt)
+    # The feature queries only read, so use a read-only connection, opened inside the
+    # task rather than passed in as a task input. DuckDB refuses a second connection to
+    # the same file with different settings, so it is closed before the mart loads
+    # below open theirs; a database that does not exist yet is created read-write
+    with shared_db(read_only=get_db_path().exists()) as db:
+        price_features = calculate_price_features(run_dt, db=db)
     
     # Calculate fundamental features (placeholder for now)
     fundamental_features = calculate_yoy_revenue_growth_proxy(run_dt)
@@ -34,32 +37,31 @@ def calculate_features(run_date_str: str):
     return {"price": price_features, "fundamental": fundamental_features}
 
 
-@task
-def score_and_save_signals(
-    price_features_df, fundamental_features_df, run_date_str: str
-) -> None:
+@task(persist_result=False)
+def score_and_save_signals(price_features_df, fundamental_features_df, run_dt: date) -> None:
     """Task to score signals and save to marts layer."""
-    from datetime import date
-    
-    run_dt = parse_run_date(run_date_str)
-    
-    logger.info(f"Scoring signals for {run_dt}")
+    logger.info("Scoring signals for {}", run_dt)
     
-    # Score signals
-    signals_df = score_signals(
-        price_features_df,
-        fundamental_features_df if not fundamental_features_df.empty else None,
-        as_of_date=run_dt,
-    )
+    # Score signals, skipping the normalization pipeline when there is nothing to score
+    if price_features_df.empty:
+        signals_df = pd.DataFrame()
+    else:
+        signals_df = score_signals(
+            price_features_df,
+            fundamental_features_df if not fundamental_features_df.empty else None,
+            as_of_date=run_dt,
+            # Outside marts so the cache is never synced with the published marts
+            cache_dir=get_settings().data_root / "cache" / "signals",
+        )
     
     # Ensure signals_df has the correct schema even if empty
     if signals_df.empty:
         signals_df = pd.DataFrame(columns=["ticker", "date", "signal_score"])
         # Add the date column value for consistency
         signals_df["date"] = pd.Series(dtype="datetime64[ns]")
-        logger.warning(f"No signals to save for {run_dt}")
-    else:
-        # Ensure date column is datetime type
+        logger.warning("No signals to save for {}", run_dt)
+    elif not pd.api.types.is_datetime64_any_dtype(signals_df["date"]):
+        # Ensure date column is datetime type, converting only when it is not already
         signals_df["date"] = pd.to_datetime(signals_df["date"])
     
     # Always save to Parquet (even if empty) to ensure schema exists
@@ -68,34 +70,27 @@ def score_and_save_signals(
     # Load into DuckDB (will create table if file doesn't exist)
     load_signal_scores_to_db(run_dt, if_exists="replace")
     
-    logger.info(f"Completed signal scoring for {run_dt}")
+    logger.info("Completed signal scoring for {}", run_dt)
     return signals_df
 
 
-@task
-def generate_and_save_positions(signals_df, run_date_str: str) -> None:
+@task(persist_result=False, cache_result_in_memory=False)
+def generate_and_save_positions(signals_df, run_dt: date) -> None:
     """Task to generate positions and save to marts layer."""
-    from datetime import date
-    import pandas as pd
+    logger.info("Generating positions for {}", run_dt)
     
-    run_dt = parse_run_date(run_date_str)
-    
-    logger.info(f"Generating positions for {run_dt}")
-    
-    # Handle None or empty DataFrame
+    # Without signals there is nothing to rank; save_positions writes the empty schema
     if signals_df is None or signals_df.empty:
-        # Create empty DataFrame with correct schema
-        signals_df = pd.DataFrame(columns=["ticker", "date", "signal_score"])
-        signals_df["date"] = pd.Series(dtype="datetime64[ns]")
-    
-    # Ensure date column exists and is datetime
-    if "date" not in signals_df.columns:
-        signals_df["date"] = pd.to_datetime(run_dt)
+        positions_df = pd.DataFrame()
     else:
-        signals_df["date"] = pd.to_datetime(signals_df["date"])
-    
-    # Generate positions (may be empty if no signals)
-    positions_df = generate_positions(signals_df, run_dt, n_longs=10, n_shorts=10)
+        # Ensure date column exists and is datetime
+        if "date" not in signals_df.columns:
+            signals_df["date"] = pd.to_datetime(run_dt)
+        elif not pd.api.types.is_datetime64_any_dtype(signals_df["date"]):
+            signals_df["date"] = pd.to_datetime(signals_df["date"])
+        
+        # Generate positions (may be empty if no valid signals)
+        positions_df = generate_positions(signals_df, run_dt, n_longs=10, n_shorts=10)
     
     # Always save to Parquet (even if empty) to ensure schema exists
     save_positions(positions_df, run_dt)
@@ -104,9 +99,9 @@ def generate_and_save_positions(signals_df, run_date_str: str) -> None:
     load_positions_to_db(run_dt, if_exists="replace")
     
     if positions_df.empty:
-        logger.warning(f"No positions generated for {run_dt}")
+        logger.warning("No positions generated for {}", run_dt)
     else:
-        logger.info(f"Completed position generation for {run_dt}")
+        logger.info("Completed position generation for {}", run_dt)
 
 
 @flow(name="build_features")
@@ -117,22 +112,23 @@ def build_features(run_date: Optional[str] = None) -> None:
     Args:
         run_date: Date string in YYYY-MM-DD format. Defaults to today.
     """
-    run_date_str = run_date or parse_run_date().strftime("%Y-%m-%d")
+    # Parse the date once and pass the date object to every task
+    run_dt = parse_run_date(run_date)
     
-    logger.info(f"Starting feature engine flow for {run_date_str}")
+    logger.info("Starting feature engine flow for {}", run_dt)
     
     # Calculate features
-    features = calculate_features(run_date_str)
+    features = calculate_features(run_dt)
     price_features_df = features["price"]
     fundamental_features_df = features["fundamental"]
     
     # Score signals and save (returns signals_df)
-    signals_df = score_and_save_signals(price_features_df, fundamental_features_df, run_date_str)
+    signals_df = score_and_save_signals(price_features_df, fundamental_features_df, run_dt)
     
     # Generate positions and save
-    generate_and_save_positions(signals_df, run_date_str)
+    generate_and_save_positions(signals_df, run_dt)
     
-    logger.info(f"Completed feature engine flow for {run_date_str}")
+    logger.info("Completed feature engine flow for {}", run_dt)
 
 
 def main(argv: Optional[list[str]] = None) -> None:
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import argparse
 import sys
+from pathlib import Path
 from typing import Optional
 
 from prefect import flow, task
@@ -10,84 +11,115 @@ from config.settings import get_settings
 from curation.curate_fundamentals import curate_quarterly_fundamentals
 from curation.curate_prices import curate_daily_prices
 from curation.validate_prices import validate_daily_prices
+from db.compact import compact_previous_month
 from db.load_curated import load_curated_fundamentals_to_db, load_curated_prices_to_db
 from logging_utils.setup import configure_logging, logger
-from utils.dates import parse_run_date
+from utils.dates import date_partition, parse_run_date
 
 
-@task
-def curate_and_validate_prices(run_date_str: str) -> None:
+@task(persist_result=False, cache_result_in_memory=False)
+def curate_and_validate_prices(
+    run_date_str: str, curated_dir: str, curated_file: str, load_to_db: bool = True
+) -> None:
     """Task to curate and validate daily prices."""
     run_dt = parse_run_date(run_date_str)
-    settings = get_settings()
     
     logger.info(f"Starting price curation for {run_dt}")
     
     # Curate prices
-    curated_df = curate_daily_prices(run_dt)
+    curated_df = curate_daily_prices(run_dt, curated_dir=Path(curated_dir))
     
     if curated_df.empty:
         logger.warning(f"No price data to curate for {run_dt}")
         return
     
     # Validate curated data
-    curated_file = (
-        settings.curated_dir
-        / "daily_prices"
-        / f"{run_dt:%Y/%m/%d}"
-        / f"{run_dt:%Y-%m-%d}.parquet"
+    validation_results = validate_daily_prices(
+        curated_df, Path(curated_file), fail_on_error=False
     )
     
-    validation_results = validate_daily_prices(curated_df, curated_file, fail_on_error=False)
-    
     if not validation_results["valid"]:
         logger.error(f"Validation failed for {run_dt}: {validation_results['errors']}")
         # Don't fail the task, but log the errors
     
-    # Load into DuckDB (append mode to accumulate historical data)
-    load_curated_prices_to_db(run_dt, if_exists="append")
+    # Backfills curate many dates first and load them with one range statement
+    if not load_to_db:
+        logger.info(f"Completed price curation for {run_dt} (DuckDB load deferred)")
+        return
+    
+    # Load into DuckDB (append mode to accumulate historical data) straight from the
+    # curated frame; if curation fell back to another date, the loader looks for the
+    # run date's file as before
+    on_run_date = bool((curated_df["date"] == run_dt).all())
+    load_curated_prices_to_db(
+        run_dt,
+        curated_dir=Path(curated_dir),
+        if_exists="append",
+        df=curated_df if on_run_date else None,
+    )
     
     logger.info(f"Completed price curation for {run_dt}")
 
 
-@task
-def curate_fundamentals(run_date_str: str) -> None:
+@task(persist_result=False, cache_result_in_memory=False)
+def compact_completed_month(run_date_str: str, curated_dir: str) -> None:
+    """Task to consolidate the previous (completed) month of curated prices."""
+    run_dt = parse_run_date(run_date_str)
+    compact_previous_month(run_dt, curated_dir=Path(curated_dir))
+
+
+@task(persist_result=False, cache_result_in_memory=False)
+def curate_fundamentals(run_date_str: str, curated_dir: str) -> None:
     """Task to curate quarterly fundamentals."""
     run_dt = parse_run_date(run_date_str)
-    settings = get_settings()
     
     logger.info(f"Starting fundamentals curation for {run_dt}")
     
     # Curate fundamentals
-    curated_df = curate_quarterly_fundamentals(run_dt)
+    curated_df = curate_quarterly_fundamentals(run_dt, curated_dir=Path(curated_dir))
     
     if curated_df.empty:
         logger.warning(f"No fundamentals data to curate for {run_dt}")
         return
     
     # Load into DuckDB (append mode for fundamentals since multiple quarters)
-    load_curated_fundamentals_to_db(run_dt, if_exists="append")
+    load_curated_fundamentals_to_db(run_dt, curated_dir=Path(curated_dir), if_exists="append")
     
     logger.info(f"Completed fundamentals curation for {run_dt}")
 
 
 @flow(name="curate_data")
-def curate_data(run_date: Optional[str] = None) -> None:
+def curate_data(run_date: Optional[str] = None, load_prices: bool = True) -> None:
     """
     Main curation flow that orchestrates price and fundamentals curation.
     
     Args:
         run_date: Date string in YYYY-MM-DD format. Defaults to today.
+        load_prices: Load the curated prices into DuckDB. Backfills pass False and
+            load the whole range once with load_curated_prices_range_to_db.
     """
     run_date_str = run_date or parse_run_date().strftime("%Y-%m-%d")
+    run_dt = parse_run_date(run_date_str)
+    
+    # Resolve settings and paths once here; tasks receive plain strings
+    curated_dir = str(get_settings().curated_dir)
+    curated_file = str(
+        Path(curated_dir)
+        / "daily_prices"
+        / date_partition(run_dt)
+        / f"{run_dt.isoformat()}.parquet"
+    )
     
     logger.info(f"Starting curation flow for {run_date_str}")
     
     # Run price curation
-    curate_and_validate_prices(run_date_str)
+    curate_and_validate_prices(run_date_str, curated_dir, curated_file, load_prices)
+    
+    # Consolidate last month's daily price files once the month is complete
+    compact_completed_month(run_date_str, curated_dir)
     
     # Run fundamentals curation
-    curate_fundamentals(run_date_str)
+    curate_fundamentals(run_date_str, curated_dir)
     
     logger.info(f"Completed curation flow for {run_date_str}")
 
@@ -1,27 +1,30 @@
 from __future__ import annotations
 
 import argparse
+import csv
 import sys
 from typing import Iterable, List, Optional
 
-import pandas as pd
 from prefect import flow, task
 
 from config.settings import get_settings
-from data_sources.sec import download_fundamentals
+from data_sources.sec import SecDownloadError, download_fundamentals_many
 from logging_utils.setup import configure_logging, logger
 from utils.dates import parse_run_date
 
 
 def load_universe(path: str) -> List[str]:
-    df = pd.read_csv(path)
-    return df["ticker"].dropna().unique().tolist()
+    # Plain csv keeps pandas out of the ingest path; dict.fromkeys dedupes in file order
+    with open(path, newline="") as f:
+        return list(dict.fromkeys(row["ticker"] for row in csv.DictReader(f) if row["ticker"]))
 
 
-@task
-def fetch_and_store_fundamentals(ticker: str, run_date_str: str) -> None:
+@task(persist_result=False)
+def fetch_and_store_fundamentals(tickers: List[str], run_date_str: str) -> List[str]:
+    """Download the whole universe in one task, recording skips once; returns failed tickers."""
     run_dt = parse_run_date(run_date_str)
-    download_fundamentals(ticker, run_dt)
+    results = download_fundamentals_many(tickers, run_dt)
+    return [ticker for ticker in tickers if ticker not in results]
 
 
 @flow(name="ingest_fundamentals")
@@ -37,8 +40,13 @@ def ingest_fundamentals(
     logger.info(
         f"Starting fundamentals ingestion for {len(universe)} tickers on {run_date_str}"
     )
-    for ticker in universe:
-        fetch_and_store_fundamentals.submit(ticker=ticker, run_date_str=run_date_str)
+    # One task for the batch so download_fundamentals_many can write the run's
+    # _skipped.parquet; its thread pool does the per-ticker fan-out
+    failed = fetch_and_store_fundamentals(universe, run_date_str)
+    if failed:
+        raise SecDownloadError(
+            f"Fundamentals download failed for {len(failed)} tickers: {', '.join(failed)}"
+        )
 
 
 def main(argv: Optional[List[str]] = None) -> None:
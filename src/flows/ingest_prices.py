@@ -1,27 +1,49 @@
 from __future__ import annotations
 
 import argparse
+import csv
 import sys
+import time
 from typing import Iterable, List, Optional
 
-import pandas as pd
 from prefect import flow, task
 
 from config.settings import get_settings
-from data_sources.stooq import fetch_stooq_prices
+from data_sources.stooq import StooqFetchError, fetch_stooq_prices_batch
 from logging_utils.setup import configure_logging, logger
 from utils.dates import parse_run_date
 
 
 def load_universe(path: str) -> List[str]:
-    df = pd.read_csv(path)
-    return df["ticker"].dropna().unique().tolist()
+    # Plain csv keeps pandas out of the ingest path; dict.fromkeys dedupes in file order
+    with open(path, newline="") as f:
+        return list(dict.fromkeys(row["ticker"] for row in csv.DictReader(f) if row["ticker"]))
 
 
-@task
-def fetch_and_store_price(ticker: str, run_date_str: str) -> None:
+# Seconds to wait before each re-fetch of the tickers still missing from the batch
+PRICE_RETRY_DELAYS = [1, 5, 30]
+
+
+@task(persist_result=False)
+def fetch_and_store_prices(tickers: List[str], run_date_str: str) -> List[str]:
+    """
+    Fetch the whole universe in one task over a shared session; returns failed tickers.
+    
+    Per-ticker failures are caught inside the batch, so Prefect task retries would
+    never see them (and would re-fetch every ticker if they did). Instead only the
+    tickers that failed are re-fetched, backing off between rounds.
+    """
     run_dt = parse_run_date(run_date_str)
-    fetch_stooq_prices(ticker, run_dt)
+    results = fetch_stooq_prices_batch(tickers, run_dt)
+    failed = [ticker for ticker in tickers if ticker not in results]
+    for delay in PRICE_RETRY_DELAYS:
+        if not failed:
+            break
+        logger.warning(f"Retrying {len(failed)} failed tickers in {delay}s")
+        time.sleep(delay)
+        results = fetch_stooq_prices_batch(failed, run_dt)
+        failed = [ticker for ticker in failed if ticker not in results]
+    return failed
 
 
 @flow(name="ingest_prices")
@@ -33,8 +55,13 @@ def ingest_prices(run_date: Optional[str] = None, tickers: Optional[Iterable[str
     universe = list(tickers or load_universe(settings.universe_file))
 
     logger.info(f"Starting price ingestion for {len(universe)} tickers on {run_date_str}")
-    for ticker in universe:
-        fetch_and_store_price.submit(ticker=ticker, run_date_str=run_date_str)
+    # One task for the batch: the bounded thread pool inside fetch_stooq_prices_batch does
+    # the fan-out, without paying Prefect's per-task submit and state overhead per ticker
+    failed = fetch_and_store_prices(universe, run_date_str)
+    if failed:
+        raise StooqFetchError(
+            f"Price ingestion failed for {len(failed)} tickers: {', '.join(failed)}"
+        )
 
 
 def main(argv: Optional[List[str]] = None) -> None:
@@ -7,8 +7,16 @@ from typing import Optional
 from loguru import logger
 
 
-def configure_logging(log_level: str = "INFO", log_path: Optional[Path] = None) -> None:
-    """Configure loguru logging with optional file sink."""
+def configure_logging(
+    log_level: str = "INFO", log_path: Optional[Path] = None, multiprocess: bool = False
+) -> None:
+    """
+    Configure loguru logging with optional file sink.
+    
+    Sinks write in the calling thread (loguru's sink lock keeps that thread-safe) unless
+    multiprocess is set, in which case records are routed through loguru's queue so
+    several processes can share the sinks, at the cost of pickling every message.
+    """
     logger.remove()
     logger.add(
         sys.stdout,
@@ -19,12 +27,12 @@ def configure_logging(log_level: str = "INFO", log_path: Optional[Path] = None)
             "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - "
             "<level>{message}</level>"
         ),
-        enqueue=True,
+        enqueue=multiprocess,
     )
 
     if log_path:
         log_path.parent.mkdir(parents=True, exist_ok=True)
-        logger.add(log_path, level=log_level.upper(), rotation="10 MB", enqueue=True)
+        logger.add(log_path, level=log_level.upper(), rotation="10 MB", enqueue=multiprocess)
 
 
 __all__ = ["configure_logging", "logger"]
@@ -1,20 +1,35 @@
 from __future__ import annotations
 
 from datetime import date, datetime
+from functools import lru_cache
 from typing import Optional
 
 
+@lru_cache(maxsize=256)
+def _parse_date_str(run_date: str) -> date:
+    """Parse a YYYY-MM-DD string, memoized since every task re-parses the same run date."""
+    # C-implemented fast path, only for the canonical YYYY-MM-DD shape: fromisoformat
+    # also accepts forms strptime rejects, such as 20240101 and 2024-W01-1
+    if len(run_date) == 10 and run_date[4] == "-" and run_date[7] == "-":
+        try:
+            return date.fromisoformat(run_date)
+        except ValueError:
+            pass
+    # strptime also accepts non-padded forms such as 2024-6-3
+    return datetime.strptime(run_date, "%Y-%m-%d").date()
+
+
 def parse_run_date(run_date: Optional[str] = None) -> date:
     """Return a date object from YYYY-MM-DD string or today if None."""
     if run_date:
-        return datetime.strptime(run_date, "%Y-%m-%d").date()
+        return _parse_date_str(run_date)
     return date.today()
 
 
 def date_partition(dt: date) -> str:
     """Return partition string YYYY/MM/DD."""
-    return f"{dt:%Y/%m/%d}"
+    # Integer formatting skips strftime's format parsing on every call
+    return f"{dt.year:04d}/{dt.month:02d}/{dt.day:02d}"
 
 
 __all__ = ["parse_run_date", "date_partition"]
-
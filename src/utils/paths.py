@@ -2,6 +2,18 @@ from __future__ import annotations
 
 from pathlib import Path
 
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Default Parquet codec for every layer: smaller files than snappy at similar write speed
+PARQUET_COMPRESSION = "zstd"
+PARQUET_COMPRESSION_LEVEL = 3
+
+# Repeated low-cardinality string columns; dictionary-encoding only these keeps
+# unique columns (e.g. file paths) from paying for a dictionary that never pays off
+DICTIONARY_COLUMNS = ["ticker", "source", "filing_type", "position_type"]
+
 
 def ensure_dir(path: Path) -> None:
     """Create directory if it does not exist."""
@@ -13,5 +25,40 @@ def resolve_path(path_str: str) -> Path:
     return Path(path_str).expanduser().resolve()
 
 
-__all__ = ["ensure_dir", "resolve_path"]
+def write_parquet(
+    df: pd.DataFrame, path: Path, use_dictionary: bool | list[str] = True
+) -> None:
+    """Write a DataFrame to Parquet using the project-wide compression settings."""
+    # Convert with Arrow's multithreaded column conversion and reuse the Arrow writer,
+    # which encodes and compresses without holding the GIL
+    write_parquet_table(
+        pa.Table.from_pandas(df, preserve_index=False), path, use_dictionary=use_dictionary
+    )
+
+
+def write_parquet_table(
+    table: pa.Table,
+    path: Path,
+    row_group_size: int | None = None,
+    use_dictionary: bool | list[str] = True,
+) -> None:
+    """Write an Arrow table to Parquet using the project-wide compression settings."""
+    pq.write_table(
+        table,
+        path,
+        compression=PARQUET_COMPRESSION,
+        compression_level=PARQUET_COMPRESSION_LEVEL,
+        row_group_size=row_group_size,
+        use_dictionary=use_dictionary,
+    )
+
 
+__all__ = [
+    "ensure_dir",
+    "resolve_path",
+    "write_parquet",
+    "write_parquet_table",
+    "DICTIONARY_COLUMNS",
+    "PARQUET_COMPRESSION",
+    "PARQUET_COMPRESSION_LEVEL",
+]
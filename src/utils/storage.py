@@ -2,19 +2,189 @@
 
 from __future__ import annotations
 
+import base64
+import gzip
+import hashlib
+import importlib.util
+import io
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from types import ModuleType
+from typing import TYPE_CHECKING, BinaryIO, Optional
 
 from loguru import logger
 
-try:
+if TYPE_CHECKING:
     from google.cloud import storage
-    from google.cloud.exceptions import NotFound
-    GCS_AVAILABLE = True
-except ImportError:
+
+# Only locate the package here; the SDK itself is imported on first use, so modules that
+# import this one without touching GCS skip its import cost and the missing-package check
+# is reported by the caller instead of at import time
+try:
+    GCS_AVAILABLE = importlib.util.find_spec("google.cloud.storage") is not None
+except ModuleNotFoundError:
     GCS_AVAILABLE = False
-    logger.warning("google-cloud-storage not installed. GCS functions will not work.")
+
+_storage: ModuleType | None = None
+
+# Concurrent blob transfers per directory sync; uploads of small mart files are latency-bound
+DEFAULT_MAX_WORKERS = 16
+
+# Files below this size go up in a single multipart request; larger ones use resumable
+# uploads in chunks (chunk sizes must be multiples of 256 KiB)
+SINGLE_SHOT_UPLOAD_LIMIT = 8 * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 16 * 1024 * 1024
+DUCKDB_UPLOAD_CHUNK_SIZE = 32 * 1024 * 1024
+
+# Read size when hashing local files for the unchanged-file check and upload verification
+MD5_READ_SIZE = 1024 * 1024
+
+# Explicit content types for the files we sync, so the SDK does not guess per upload
+CONTENT_TYPES = {".json": "application/json", ".csv": "text/csv", ".txt": "text/plain"}
+DEFAULT_CONTENT_TYPE = "application/octet-stream"
+
+# Text sidecars are stored gzip-encoded (GCS decompresses them again on download);
+# Parquet and DuckDB files are already compressed and go up as-is
+GZIP_SUFFIXES = {".json", ".csv", ".txt"}
+
+# Written at the marts prefix root by sync_marts_to_gcs whenever the synced tree changes;
+# its etag, cached locally after a download, lets sync_marts_from_gcs skip no-op syncs
+MANIFEST_NAME = "manifest.json"
+MANIFEST_ETAG_FILE = ".manifest_etag"
+
+
+def _require_storage() -> ModuleType:
+    """Import google.cloud.storage on first use, raising ImportError if it is not installed."""
+    global _storage
+    if _storage is None:
+        if not GCS_AVAILABLE:
+            raise ImportError("google-cloud-storage is required for GCS operations")
+        from google.cloud import storage as _storage
+    return _storage
+
+
+@lru_cache(maxsize=1)
+def _default_client() -> storage.Client:
+    """Build the default storage client once; credential parsing and the HTTP pool are reused."""
+    return _require_storage().Client()
+
+
+def _stream_md5(f: BinaryIO) -> str:
+    """Return the base64 MD5 digest of an open file, in the format GCS reports as md5_hash."""
+    digest = hashlib.md5()
+    while chunk := f.read(MD5_READ_SIZE):
+        digest.update(chunk)
+    return base64.b64encode(digest.digest()).decode("ascii")
+
+
+def _upload_if_changed(
+    bucket: storage.Bucket,
+    file_path: Path,
+    blob_path: str,
+    remote: tuple[int | None, str | None] | None,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+) -> bool:
+    """
+    Upload one file unless the remote blob already has the same content.
+    
+    Args:
+        bucket: Destination bucket
+        file_path: Local file to upload
+        blob_path: Destination blob name
+        remote: (size, md5_hash) of the existing remote blob, or None if it does not exist
+        chunk_size: Resumable upload chunk size for large files
+        
+    Returns:
+        True if the file was uploaded, False if it was skipped
+    """
+    gzip_encode = file_path.suffix in GZIP_SUFFIXES
+    
+    with open(file_path, "rb") as f:
+        if gzip_encode:
+            # mtime=0 keeps the compressed bytes, and so their MD5, stable between runs
+            payload = io.BytesIO(gzip.compress(f.read(), mtime=0))
+            size = payload.getbuffer().nbytes
+        else:
+            payload = f
+            size = os.fstat(f.fileno()).st_size
+        
+        # One streaming read yields the MD5 for both the unchanged check and the upload,
+        # so the file is not read a second time to hash it
+        md5_hash = _stream_md5(payload)
+        if remote == (size, md5_hash):
+            logger.debug(f"Skipping {file_path} (remote is unchanged)")
+            return False
+        
+        # Size the upload buffer to the file: no resumable session or chunk buffer for
+        # small files. Sending the precomputed MD5 lets GCS verify the received bytes.
+        blob = bucket.blob(blob_path)
+        blob.chunk_size = None if size < SINGLE_SHOT_UPLOAD_LIMIT else chunk_size
+        blob.md5_hash = md5_hash
+        if gzip_encode:
+            blob.content_encoding = "gzip"
+        payload.seek(0)
+        blob.upload_from_file(
+            payload,
+            size=size,
+            content_type=CONTENT_TYPES.get(file_path.suffix, DEFAULT_CONTENT_TYPE),
+        )
+    logger.debug(f"Uploaded {file_path} to gs://{bucket.name}/{blob_path}")
+    return True
+
+
+def _walk_uploads(local_dir: Path, gcs_path: str, chunk_size: int) -> list[tuple[Path, str, int]]:
+    """
+    List (file, blob path, chunk size) upload jobs for a directory tree.
+    
+    os.walk reads file/dir type from the directory entries, so there is no extra
+    stat per entry as with rglob() + is_file(). Relative paths are sliced off the
+    joined string rather than built with Path.relative_to().as_posix() per file.
+    """
+    prefix = gcs_path.rstrip("/") + "/"
+    base_len = len(os.path.join(str(local_dir), ""))
+    uploads = []
+    for root, _dirs, files in os.walk(local_dir):
+        for name in files:
+            file_str = os.path.join(root, name)
+            blob_path = prefix + file_str[base_len:].replace(os.sep, "/")
+            uploads.append((Path(file_str), blob_path, chunk_size))
+    return uploads
+
+
+def _upload_many(
+    bucket: storage.Bucket,
+    uploads: list[tuple[Path, str, int]],
+    remote_prefix: str,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> int:
+    """
+    Upload changed files from a job list over a shared thread pool.
+    
+    Args:
+        bucket: Destination bucket
+        uploads: (file, blob path, chunk size) jobs
+        remote_prefix: Prefix covering every destination blob, listed once for the skip check
+        max_workers: Number of concurrent uploads
+        
+    Returns:
+        Number of files uploaded (the rest were unchanged and skipped)
+    """
+    # One listing gives size and MD5 for every existing blob under the prefix
+    remote = {
+        blob.name: (blob.size, blob.md5_hash)
+        for blob in bucket.list_blobs(prefix=remote_prefix)
+    }
+    
+    def _upload(item: tuple[Path, str, int]) -> bool:
+        file_path, blob_path, chunk_size = item
+        return _upload_if_changed(bucket, file_path, blob_path, remote.get(blob_path), chunk_size)
+    
+    # Each upload is a handful of round trips, so overlap them across a thread pool
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(uploads)))) as pool:
+        return sum(pool.map(_upload, uploads))
 
 
 def upload_to_gcs(
@@ -22,6 +192,8 @@ def upload_to_gcs(
     local_path: Path | str,
     gcs_path: str,
     client: Optional[storage.Client] = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
 ) -> None:
     """
     Upload a file or directory to GCS.
@@ -31,56 +203,30 @@ def upload_to_gcs(
         local_path: Local file or directory path
         gcs_path: Destination path in GCS (without bucket name)
         client: Optional storage client (creates new if not provided)
+        max_workers: Number of concurrent uploads when syncing a directory
+        chunk_size: Resumable upload chunk size for files too large for a single request
     """
-    if not GCS_AVAILABLE:
-        raise ImportError("google-cloud-storage is required for GCS operations")
+    _require_storage()
     
     local_path = Path(local_path)
     if not local_path.exists():
         raise FileNotFoundError(f"Local path does not exist: {local_path}")
     
-    if client is None:
-        client = storage.Client()
+    client = client or _default_client()
     
     bucket = client.bucket(bucket_name)
     
     if local_path.is_file():
-        # Upload single file (incremental: skip if remote is newer)
-        blob = bucket.blob(gcs_path)
-        local_mtime = local_path.stat().st_mtime
-        
-        # Check if blob exists and compare modification times
-        if blob.exists():
-            remote_mtime = blob.updated.timestamp() if blob.updated else 0
-            if local_mtime <= remote_mtime:
-                logger.debug(f"Skipping {local_path} (remote is up to date)")
-                return
-        
-        blob.upload_from_filename(str(local_path))
-        logger.info(f"Uploaded {local_path} to gs://{bucket_name}/{gcs_path}")
+        # Upload single file (incremental: skip if remote content is identical)
+        remote_blob = bucket.get_blob(gcs_path)
+        remote = (remote_blob.size, remote_blob.md5_hash) if remote_blob is not None else None
+        if _upload_if_changed(bucket, local_path, gcs_path, remote, chunk_size):
+            logger.info(f"Uploaded {local_path} to gs://{bucket_name}/{gcs_path}")
     elif local_path.is_dir():
-        # Upload directory recursively (incremental sync)
-        uploaded_count = 0
-        skipped_count = 0
-        for file_path in local_path.rglob("*"):
-            if file_path.is_file():
-                # Preserve relative path structure
-                relative_path = file_path.relative_to(local_path)
-                blob_path = f"{gcs_path.rstrip('/')}/{relative_path.as_posix()}"
-                blob = bucket.blob(blob_path)
-                local_mtime = file_path.stat().st_mtime
-                
-                # Check if blob exists and compare modification times
-                if blob.exists():
-                    remote_mtime = blob.updated.timestamp() if blob.updated else 0
-                    if local_mtime <= remote_mtime:
-                        skipped_count += 1
-                        logger.debug(f"Skipping {file_path} (remote is up to date)")
-                        continue
-                
-                blob.upload_from_filename(str(file_path))
-                uploaded_count += 1
-                logger.debug(f"Uploaded {file_path} to gs://{bucket_name}/{blob_path}")
+        # Upload directory recursively (incremental sync), preserving relative path structure
+        uploads = _walk_uploads(local_path, gcs_path, chunk_size)
+        uploaded_count = _upload_many(bucket, uploads, f"{gcs_path.rstrip('/')}/", max_workers)
+        skipped_count = len(uploads) - uploaded_count
         
         logger.info(
             f"Synced directory {local_path} to gs://{bucket_name}/{gcs_path} "
@@ -95,6 +241,7 @@ def download_from_gcs(
     gcs_path: str,
     local_path: Path | str,
     client: Optional[storage.Client] = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
 ) -> None:
     """
     Download a file or directory from GCS.
@@ -104,44 +251,59 @@ def download_from_gcs(
         gcs_path: Source path in GCS (without bucket name)
         local_path: Local destination path
         client: Optional storage client (creates new if not provided)
+        max_workers: Number of concurrent downloads when fetching a directory
     """
-    if not GCS_AVAILABLE:
-        raise ImportError("google-cloud-storage is required for GCS operations")
+    _require_storage()
+    from google.cloud.exceptions import NotFound
     
     local_path = Path(local_path)
     
-    if client is None:
-        client = storage.Client()
+    client = client or _default_client()
     
     bucket = client.bucket(bucket_name)
     
-    try:
-        # Try to get the blob (file)
-        blob = bucket.blob(gcs_path)
-        if blob.exists():
-            # It's a file
+    # A trailing slash (or an existing local directory) already marks a directory;
+    # otherwise try the path as a file with a single optimistic GET rather than an
+    # existence check followed by the download
+    if not gcs_path.endswith("/") and not local_path.is_dir():
+        try:
             local_path.parent.mkdir(parents=True, exist_ok=True)
-            blob.download_to_filename(str(local_path))
+            bucket.blob(gcs_path).download_to_filename(str(local_path))
             logger.info(f"Downloaded gs://{bucket_name}/{gcs_path} to {local_path}")
-        else:
-            # Try as a directory prefix
-            blobs = list(bucket.list_blobs(prefix=gcs_path.rstrip("/") + "/"))
-            if not blobs:
-                raise FileNotFoundError(f"No files found at gs://{bucket_name}/{gcs_path}")
-            
-            # Download all blobs with the prefix
-            for blob in blobs:
-                # Remove the prefix to get relative path
-                relative_path = blob.name[len(gcs_path.rstrip("/") + "/"):]
-                if not relative_path:  # Skip if it's the prefix itself
-                    continue
-                
-                local_file = local_path / relative_path
-                local_file.parent.mkdir(parents=True, exist_ok=True)
-                blob.download_to_filename(str(local_file))
-                logger.debug(f"Downloaded gs://{bucket_name}/{blob.name} to {local_file}")
-            
-            logger.info(f"Downloaded directory gs://{bucket_name}/{gcs_path} to {local_path}")
+            return
+        except NotFound:
+            # Not a file: drop any empty download and fall through to the prefix
+            local_path.unlink(missing_ok=True)
+    
+    try:
+        # Try as a directory prefix
+        blobs = list(bucket.list_blobs(prefix=gcs_path.rstrip("/") + "/"))
+        if not blobs:
+            raise FileNotFoundError(f"No files found at gs://{bucket_name}/{gcs_path}")
+        
+        # Map blobs to local files, removing the prefix to get relative paths
+        # (skipping the prefix placeholder itself)
+        prefix_len = len(gcs_path.rstrip("/") + "/")
+        downloads = [
+            (blob, local_path / blob.name[prefix_len:])
+            for blob in blobs
+            if blob.name[prefix_len:]
+        ]
+        
+        # Create each destination directory once rather than once per file
+        for parent in {local_file.parent for _, local_file in downloads}:
+            parent.mkdir(parents=True, exist_ok=True)
+        
+        def _download(item: tuple[storage.Blob, Path]) -> None:
+            blob, local_file = item
+            blob.download_to_filename(str(local_file))
+            logger.debug(f"Downloaded gs://{bucket_name}/{blob.name} to {local_file}")
+        
+        # Overlap the GETs; list() re-raises the first failure, e.g. NotFound
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(downloads)))) as pool:
+            list(pool.map(_download, downloads))
+        
+        logger.info(f"Downloaded directory gs://{bucket_name}/{gcs_path} to {local_path}")
     except NotFound:
         raise FileNotFoundError(f"Path not found in GCS: gs://{bucket_name}/{gcs_path}")
 
@@ -151,6 +313,7 @@ def sync_marts_to_gcs(
     local_marts_dir: Path | str,
     gcs_prefix: str = "marts/",
     client: Optional[storage.Client] = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
 ) -> None:
     """
     Sync marts data (signal_scores, positions, duckdb) to GCS.
@@ -160,44 +323,48 @@ def sync_marts_to_gcs(
         local_marts_dir: Local marts directory path
         gcs_prefix: Prefix path in GCS (default: "marts/")
         client: Optional storage client
+        max_workers: Number of concurrent uploads shared across all three directories
     """
+    _require_storage()
+    
     local_marts_dir = Path(local_marts_dir)
     
     if not local_marts_dir.exists():
         logger.warning(f"Marts directory does not exist: {local_marts_dir}")
         return
     
-    # Sync signal_scores
-    signal_scores_dir = local_marts_dir / "signal_scores"
-    if signal_scores_dir.exists():
-        upload_to_gcs(
-            bucket_name,
-            signal_scores_dir,
-            f"{gcs_prefix}signal_scores/",
-            client=client,
-        )
+    # Resolve the client once so every upload shares one connection pool
+    client = client or _default_client()
     
-    # Sync positions
-    positions_dir = local_marts_dir / "positions"
-    if positions_dir.exists():
-        upload_to_gcs(
-            bucket_name,
-            positions_dir,
-            f"{gcs_prefix}positions/",
-            client=client,
-        )
+    # Walk signal_scores, positions and the DuckDB database (large binary files, so
+    # bigger resumable chunks) into one job list, so uploads from all three overlap
+    subdirs = [
+        ("signal_scores", UPLOAD_CHUNK_SIZE),
+        ("positions", UPLOAD_CHUNK_SIZE),
+        ("duckdb", DUCKDB_UPLOAD_CHUNK_SIZE),
+    ]
+    uploads = []
+    for subdir, chunk_size in subdirs:
+        local_dir = local_marts_dir / subdir
+        if local_dir.exists():
+            uploads.extend(_walk_uploads(local_dir, f"{gcs_prefix}{subdir}/", chunk_size))
     
-    # Sync DuckDB database
-    duckdb_dir = local_marts_dir / "duckdb"
-    if duckdb_dir.exists():
-        upload_to_gcs(
-            bucket_name,
-            duckdb_dir,
-            f"{gcs_prefix}duckdb/",
-            client=client,
+    bucket = client.bucket(bucket_name)
+    uploaded_count = _upload_many(bucket, uploads, gcs_prefix, max_workers)
+    
+    # Rewrite the manifest only when something changed, so its etag stays stable
+    # across no-op syncs and readers can skip their download
+    manifest = bucket.blob(f"{gcs_prefix}{MANIFEST_NAME}")
+    if uploaded_count or not manifest.exists():
+        manifest.upload_from_string(
+            json.dumps({"files": sorted(blob_path for _, blob_path, _ in uploads)}),
+            content_type=CONTENT_TYPES[".json"],
         )
     
-    logger.info(f"Synced marts data from {local_marts_dir} to gs://{bucket_name}/{gcs_prefix}")
+    logger.info(
+        f"Synced marts data from {local_marts_dir} to gs://{bucket_name}/{gcs_prefix} "
+        f"({uploaded_count} uploaded, {len(uploads) - uploaded_count} skipped)"
+    )
 
 
 def sync_marts_from_gcs(
@@ -218,8 +385,7 @@ def sync_marts_from_gcs(
     local_marts_dir = Path(local_marts_dir)
     local_marts_dir.mkdir(parents=True, exist_ok=True)
     
-    if client is None:
-        client = storage.Client()
+    client = client or _default_client()
     
     bucket = client.bucket(bucket_name)
     
@@ -232,6 +398,19 @@ def sync_marts_from_gcs(
         logger.warning(f"Could not check bucket existence: {e}")
         return
     
+    # One metadata request answers the common "already in sync" case
+    manifest = bucket.get_blob(f"{gcs_prefix}{MANIFEST_NAME}")
+    etag_path = local_marts_dir / MANIFEST_ETAG_FILE
+    if (
+        manifest is not None
+        and etag_path.exists()
+        and etag_path.read_text().strip() == manifest.etag
+    ):
+        logger.info(
+            f"Marts data in {local_marts_dir} already matches gs://{bucket_name}/{gcs_prefix}"
+        )
+        return
+    
     # Sync signal_scores
     signal_scores_local = local_marts_dir / "signal_scores"
     try:
@@ -268,6 +447,11 @@ def sync_marts_from_gcs(
     except FileNotFoundError:
         logger.info(f"No duckdb found in GCS, skipping")
     
+    # Record the manifest seen before downloading; a sync that lands mid-download
+    # changes the etag, so the next call downloads again rather than missing it
+    if manifest is not None:
+        etag_path.write_text(manifest.etag)
+    
     logger.info(f"Synced marts data from gs://{bucket_name}/{gcs_prefix} to {local_marts_dir}")
 
 
@@ -277,5 +461,9 @@ __all__ = [
     "sync_marts_to_gcs",
     "sync_marts_from_gcs",
     "GCS_AVAILABLE",
+    "DEFAULT_MAX_WORKERS",
+    "UPLOAD_CHUNK_SIZE",
+    "DUCKDB_UPLOAD_CHUNK_SIZE",
+    "MANIFEST_NAME",
 ]
 
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import os
+from datetime import date
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from db.compact import compact_month, compacted_month_path, current_compacted_month
+from db.duckdb_client import DuckDBClient
+from db.load_curated import load_curated_prices_range_to_db
+from utils.paths import write_parquet
+
+
+def _write_day(curated_dir, day: pd.Timestamp) -> None:
+    path = curated_dir / "daily_prices" / f"{day:%Y/%m/%d}" / f"{day:%Y-%m-%d}.parquet"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    frame = pd.DataFrame(
+        {
+            "date": [day.date()] * 2,
+            "open": 1.0,
+            "high": 1.0,
+            "low": 1.0,
+            "close": [1.0, 2.0],
+            "volume": [10, 20],
+            "ticker": ["B", "A"],
+            "source": "stooq",
+        }
+    )
+    write_parquet(frame, path)
+
+
+@pytest.fixture
+def curated_dir(tmp_path):
+    for day in pd.date_range("2024-01-29", "2024-02-05"):
+        _write_day(tmp_path, day)
+    return tmp_path
+
+
+def test_compact_month_sorts_by_ticker_and_date(curated_dir):
+    output = compact_month(2024, 1, curated_dir=curated_dir)
+    
+    assert output == compacted_month_path(2024, 1, curated_dir)
+    table = pq.read_table(output).to_pandas()
+    assert len(table) == 6
+    keys = list(zip(table["ticker"], table["date"]))
+    assert keys == sorted(keys)
+    assert table["ticker"].tolist() == ["A"] * 3 + ["B"] * 3
+
+
+def test_compact_month_without_daily_files(curated_dir):
+    assert compact_month(2023, 12, curated_dir=curated_dir) is None
+
+
+def test_compacted_month_goes_stale_when_a_day_is_rewritten(curated_dir):
+    output = compact_month(2024, 1, curated_dir=curated_dir)
+    assert current_compacted_month(2024, 1, curated_dir) == output
+    
+    # Age the compacted file so a daily file looks re-curated after it
+    day_file = curated_dir / "daily_prices" / "2024" / "01" / "30" / "2024-01-30.parquet"
+    older = day_file.stat().st_mtime - 10
+    os.utime(output, (older, older))
+    assert current_compacted_month(2024, 1, curated_dir) is None
+    
+    # An unforced compaction picks the change up and is current again
+    compact_month(2024, 1, curated_dir=curated_dir)
+    assert current_compacted_month(2024, 1, curated_dir) == output
+
+
+def test_range_load_mixes_compacted_and_daily_files(curated_dir):
+    compact_month(2024, 1, curated_dir=curated_dir)
+    db = DuckDBClient()
+    try:
+        load_curated_prices_range_to_db(
+            date(2024, 1, 30), date(2024, 2, 3), curated_dir=curated_dir, db=db
+        )
+        rows = db.query("SELECT MIN(date), MAX(date), COUNT(*) FROM curated.daily_prices")
+    finally:
+        db.close()
+    assert rows == [(date(2024, 1, 30), date(2024, 2, 3), 10)]
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+
+from utils.dates import date_partition, parse_run_date
+
+
+def test_parse_run_date_accepts_iso_and_unpadded():
+    assert parse_run_date("2024-01-05") == date(2024, 1, 5)
+    assert parse_run_date("2024-6-3") == date(2024, 6, 3)
+
+
+@pytest.mark.parametrize("value", ["20240105", "2024-W01-1", "2024-02-30", "2024/01/05"])
+def test_parse_run_date_rejects_other_shapes(value):
+    with pytest.raises(ValueError):
+        parse_run_date(value)
+
+
+def test_date_partition():
+    assert date_partition(date(2024, 3, 7)) == "2024/03/07"
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from db.duckdb_client import DuckDBClient
+from db.load_curated import _ensure_daily_prices_table, load_curated_prices_to_db
+
+
+def _prices(day: date, tickers: list[str], close: float = 1.0) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "date": [day] * len(tickers),
+            "open": close,
+            "high": close,
+            "low": close,
+            "close": close,
+            "volume": [100] * len(tickers),
+            "ticker": tickers,
+            "source": "stooq",
+        }
+    )
+
+
+@pytest.fixture
+def db():
+    client = DuckDBClient()
+    client.create_schema("curated")
+    yield client
+    client.close()
+
+
+def test_ensure_table_migrates_legacy_table_to_primary_key(db):
+    db.execute(
+        "CREATE TABLE curated.daily_prices (date DATE, open DOUBLE, high DOUBLE, low DOUBLE, "
+        "close DOUBLE, volume BIGINT, ticker VARCHAR, source VARCHAR)"
+    )
+    db.execute(
+        "INSERT INTO curated.daily_prices VALUES "
+        "('2024-01-02', 1, 1, 1, 1, 1, 'A', 's'), "
+        "('2024-01-02', 1, 1, 1, 1, 1, 'A', 's'), "
+        "('2024-01-02', 1, 1, 1, 1, 1, 'B', 's')"
+    )
+    assert not db.has_primary_key("daily_prices")
+    
+    _ensure_daily_prices_table(db)
+    
+    assert db.has_primary_key("daily_prices")
+    assert db.query("SELECT ticker, COUNT(*) FROM curated.daily_prices GROUP BY 1 ORDER BY 1") == [
+        ("A", 1),
+        ("B", 1),
+    ]
+
+
+def test_has_primary_key_is_cached_until_ddl(db):
+    _ensure_daily_prices_table(db)
+    calls = []
+    execute = db.execute
+    
+    def counting_execute(query, params=None):
+        if "duckdb_constraints" in query:
+            calls.append(query)
+        return execute(query, params)
+    
+    db.execute = counting_execute
+    for _ in range(3):
+        _ensure_daily_prices_table(db)
+    assert len(calls) == 1
+    
+    db.execute("CREATE TABLE curated.other (a INTEGER)")
+    _ensure_daily_prices_table(db)
+    assert len(calls) == 2
+
+
+def test_load_upserts_on_ticker_and_date(db):
+    day = date(2024, 1, 2)
+    load_curated_prices_to_db(day, db=db, df=_prices(day, ["A", "B"], close=1.0))
+    load_curated_prices_to_db(day, db=db, df=_prices(day, ["A"], close=2.0))
+    assert db.query("SELECT ticker, close FROM curated.daily_prices ORDER BY ticker") == [
+        ("A", 2.0),
+        ("B", 1.0),
+    ]
+
+
+def test_load_honors_if_exists(db):
+    load_curated_prices_to_db(date(2024, 1, 2), db=db, df=_prices(date(2024, 1, 2), ["A"]))
+    
+    with pytest.raises(ValueError):
+        load_curated_prices_to_db(
+            date(2024, 1, 3), db=db, df=_prices(date(2024, 1, 3), ["A"]), if_exists="fail"
+        )
+    
+    load_curated_prices_to_db(
+        date(2024, 1, 3), db=db, df=_prices(date(2024, 1, 3), ["B"]), if_exists="replace"
+    )
+    assert db.query("SELECT ticker FROM curated.daily_prices") == [("B",)]
+    
+    with pytest.raises(ValueError):
+        load_curated_prices_to_db(date(2024, 1, 3), db=db, if_exists="overwrite")
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from db.duckdb_client import DuckDBClient
+from db.load_marts import _replace_date_from_parquet
+
+
+@pytest.fixture
+def db():
+    client = DuckDBClient()
+    client.create_schema("marts")
+    yield client
+    client.close()
+
+
+def _write(tmp_path, day: str, **columns) -> object:
+    path = tmp_path / f"{day}-{len(list(tmp_path.iterdir()))}.parquet"
+    frame = pd.DataFrame({"ticker": ["A", "B"], "date": pd.to_datetime([day, day]), **columns})
+    frame.to_parquet(path, index=False)
+    return path
+
+
+def _totals(db) -> list[tuple]:
+    return db.query(
+        "SELECT CAST(date AS DATE), SUM(signal_score) FROM marts.signal_scores GROUP BY 1 ORDER BY 1"
+    )
+
+
+def test_replace_date_swaps_only_that_date(db, tmp_path):
+    _replace_date_from_parquet(
+        db, _write(tmp_path, "2024-01-02", signal_score=[1.0, 2.0]), "signal_scores", date(2024, 1, 2)
+    )
+    _replace_date_from_parquet(
+        db, _write(tmp_path, "2024-01-03", signal_score=[3.0, 4.0]), "signal_scores", date(2024, 1, 3)
+    )
+    _replace_date_from_parquet(
+        db, _write(tmp_path, "2024-01-03", signal_score=[5.0, 6.0]), "signal_scores", date(2024, 1, 3)
+    )
+    assert _totals(db) == [(date(2024, 1, 2), 3.0), (date(2024, 1, 3), 11.0)]
+
+
+def test_replace_date_keeps_history_on_schema_drift(db, tmp_path):
+    _replace_date_from_parquet(
+        db, _write(tmp_path, "2024-01-02", signal_score=[1.0, 2.0]), "signal_scores", date(2024, 1, 2)
+    )
+    _replace_date_from_parquet(
+        db,
+        _write(tmp_path, "2024-01-03", signal_score=[3.0, 4.0], momentum_zscore=[0.5, -0.5]),
+        "signal_scores",
+        date(2024, 1, 3),
+    )
+    
+    assert _totals(db) == [(date(2024, 1, 2), 3.0), (date(2024, 1, 3), 7.0)]
+    assert db.query(
+        "SELECT CAST(date AS DATE), COUNT(momentum_zscore) FROM marts.signal_scores "
+        "GROUP BY 1 ORDER BY 1"
+    ) == [(date(2024, 1, 2), 0), (date(2024, 1, 3), 2)]
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from features.position_generator import _smallest_k
+
+
+@pytest.mark.parametrize("k", [0, 1, 2, 3, 4, 5])
+def test_smallest_k_matches_nsmallest_keep_first(k):
+    values = np.array([3.0, 1.0, 2.0, 1.0, 2.0, 5.0, 2.0])
+    expected = pd.Series(values).nsmallest(k, keep="first").index.to_numpy()
+    np.testing.assert_array_equal(_smallest_k(values, k), expected)
+
+
+def test_smallest_k_fills_boundary_ties_in_row_order():
+    values = np.array([2.0, 1.0, 2.0, 2.0, 0.0])
+    # 0.0 and 1.0, then the first of the three tied 2.0s
+    np.testing.assert_array_equal(_smallest_k(values, 3), [4, 1, 0])
+
+
+def test_smallest_k_clamps_k():
+    values = np.array([1.0, 0.0])
+    np.testing.assert_array_equal(_smallest_k(values, 10), [1, 0])
+    assert len(_smallest_k(values, -1)) == 0
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from features import signal_scorer
+from features.signal_scorer import _signals_cache_key, score_signals
+
+AS_OF = pd.Timestamp("2024-05-02")
+
+
+@pytest.fixture
+def features():
+    return pd.DataFrame(
+        {
+            "ticker": ["A", "B", "C", "D"],
+            "date": pd.to_datetime([AS_OF] * 4),
+            "momentum_60d": [1.0, 2.0, 3.0, 5.0],
+            "realized_vol_20d": [1.0, 0.0, 3.0, 2.0],
+        }
+    )
+
+
+def test_cache_key_changes_with_inputs(features):
+    key = _signals_cache_key(features, None, AS_OF)
+    assert key == _signals_cache_key(features.copy(), None, AS_OF)
+    assert key != _signals_cache_key(features.assign(momentum_60d=[1.0, 2.0, 3.0, 6.0]), None, AS_OF)
+    assert key != _signals_cache_key(features.rename(columns={"momentum_60d": "m"}), None, AS_OF)
+    assert key != _signals_cache_key(features, features, AS_OF)
+    assert key != _signals_cache_key(features, None, pd.Timestamp("2024-05-03"))
+
+
+def test_cache_hit_and_invalidation(features, tmp_path, monkeypatch):
+    first = score_signals(features, as_of_date=AS_OF, cache_dir=tmp_path)
+    
+    # Same inputs: served from the cache file
+    cached = score_signals(features, as_of_date=AS_OF, cache_dir=tmp_path)
+    pd.testing.assert_frame_equal(cached, first)
+    
+    # Changed inputs: recomputed, and the per-date file is overwritten rather than added to
+    def fail_read(*args, **kwargs):
+        raise AssertionError("cache should not be read for changed inputs")
+    
+    monkeypatch.setattr(signal_scorer.pd, "read_parquet", fail_read)
+    changed = score_signals(
+        features.assign(momentum_60d=[4.0, 1.0, 3.0, 0.0]), as_of_date=AS_OF, cache_dir=tmp_path
+    )
+    assert not changed["signal_score"].equals(first["signal_score"])
+    assert [p.name for p in tmp_path.iterdir()] == ["signals_2024-05-02.parquet"]
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+import tenacity
+
+from data_sources import stooq
+
+
+@pytest.mark.parametrize(
+    ("ticker", "symbol"),
+    [
+        ("AAPL", "AAPL.US"),
+        ("BRK.B", "BRK.B.US"),
+        ("SAP.DE", "SAP.DE"),
+        ("aapl.us", "aapl.us"),
+        ("KGH.PL", "KGH"),
+        ("^SPX", "^SPX"),
+    ],
+)
+def test_stooq_symbol_matches_pandas_datareader(ticker, symbol):
+    assert stooq._stooq_symbol(ticker) == symbol
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+    
+    def raise_for_status(self):
+        pass
+
+
+class _Session:
+    def __init__(self, text):
+        self.text = text
+        self.calls = 0
+    
+    def get(self, *args, **kwargs):
+        self.calls += 1
+        return _Response(self.text)
+
+
+@pytest.fixture
+def no_retry_wait(monkeypatch):
+    monkeypatch.setattr(stooq._fetch_stooq_window.retry, "wait", tenacity.wait_none())
+
+
+def test_fetch_window_parses_csv(no_retry_wait):
+    session = _Session("Date,Open,High,Low,Close,Volume\n2024-01-02,1,2,0.5,1.5,100\n")
+    df = stooq._fetch_stooq_window(session, "AAPL", date(2024, 1, 1), date(2024, 1, 3))
+    assert list(df.columns) == ["Date", "Open", "High", "Low", "Close", "Volume"]
+    assert len(df) == 1
+
+
+@pytest.mark.parametrize("body", ["No data", "<html>Exceeded the daily hits limit</html>"])
+def test_fetch_window_treats_non_csv_as_failure(no_retry_wait, body):
+    session = _Session(body)
+    with pytest.raises(ValueError):
+        stooq._fetch_stooq_window(session, "AAPL", date(2024, 1, 1), date(2024, 1, 3))
+    # Retried before giving up
+    assert session.calls == 3
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import base64
+import gzip
+import hashlib
+
+import pytest
+
+from utils import storage
+
+
+class _Blob:
+    def __init__(self, name):
+        self.name = name
+        self.uploaded = None
+        self.content_encoding = None
+    
+    def upload_from_file(self, f, size=None, content_type=None):
+        self.uploaded = f.read()
+        self.content_type = content_type
+
+
+class _Bucket:
+    name = "test-bucket"
+    
+    def __init__(self):
+        self.blobs = {}
+    
+    def blob(self, name):
+        return self.blobs.setdefault(name, _Blob(name))
+
+
+def _md5(data: bytes) -> str:
+    return base64.b64encode(hashlib.md5(data).digest()).decode("ascii")
+
+
+@pytest.fixture
+def parquet_file(tmp_path):
+    path = tmp_path / "2024-01-02.parquet"
+    path.write_bytes(b"PAR1" + bytes(range(256)) * 4 + b"PAR1")
+    return path
+
+
+def test_upload_skips_when_size_and_md5_match(parquet_file):
+    data = parquet_file.read_bytes()
+    bucket = _Bucket()
+    
+    uploaded = storage._upload_if_changed(
+        bucket, parquet_file, "marts/x.parquet", (len(data), _md5(data))
+    )
+    
+    assert uploaded is False
+    assert bucket.blobs == {}
+
+
+@pytest.mark.parametrize("remote", ["missing", "other_size", "other_md5"])
+def test_upload_when_remote_missing_or_different(parquet_file, remote):
+    data = parquet_file.read_bytes()
+    remote = {
+        "missing": None,
+        "other_size": (len(data) + 1, _md5(data)),
+        "other_md5": (len(data), _md5(b"other")),
+    }[remote]
+    bucket = _Bucket()
+    
+    assert storage._upload_if_changed(bucket, parquet_file, "marts/x.parquet", remote) is True
+    
+    blob = bucket.blobs["marts/x.parquet"]
+    assert blob.uploaded == data
+    assert blob.md5_hash == _md5(data)
+    assert blob.chunk_size is None
+
+
+def test_text_files_are_gzipped_deterministically(tmp_path):
+    path = tmp_path / "manifest.json"
+    path.write_text('{"files": []}')
+    compressed = gzip.compress(path.read_bytes(), mtime=0)
+    bucket = _Bucket()
+    
+    assert storage._upload_if_changed(bucket, path, "marts/manifest.json", None) is True
+    blob = bucket.blobs["marts/manifest.json"]
+    assert blob.uploaded == compressed
+    assert blob.content_encoding == "gzip"
+    
+    # The stable gzip bytes make the next sync a no-op
+    assert (
+        storage._upload_if_changed(
+            _Bucket(), path, "marts/manifest.json", (len(compressed), _md5(compressed))
+        )
+        is False
+    )